@@ -1,14 +1,19 @@
 #!/bin/bash
 
+# jemalloc keeps long-running inference workers from fragmenting the heap
+JEMALLOC=${JEMALLOC:-/usr/lib/x86_64-linux-gnu/libjemalloc.so.2}
+
 (
   cd main/backend || exit
   echo "Starting Python server..."
+  [ -f "$JEMALLOC" ] && export LD_PRELOAD="$JEMALLOC"
   python3 backend-server.py
 ) &
 
 (
   cd main/backend || exit
   echo "Starting ML backend..."
+  [ -f "$JEMALLOC" ] && export LD_PRELOAD="$JEMALLOC"
   python3 mlserver.py
 ) &
 
@@ -1,19 +1,61 @@
 import mysql.connector
+from mysql.connector import pooling
 import os
 from dotenv import load_dotenv
 import fastapi
 import uvicorn
+from fastapi import BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
-import requests
+from bisect import bisect_left
+import numpy as np
+import csv
+import httpx
+import orjson
+import re
+import redis
+import tempfile
+import time
+
+# Optional: Hyperscan compiles wildcard blocklists into a single DFA scan per field
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 ML_SERVER_URL = "http://localhost:8100/mlpredict"
+ML_BATCH_URL = "http://localhost:8100/mlpredict_batch"
 REPORT_API_URL = "http://localhost:8200/report"
+JSON_HEADERS = {"content-type": "application/json"}
+# Local copy is kept short so a Redis invalidation from the admin UI shows up quickly
+RULES_TTL = 5
+RULES_CACHE_KEY = "v1:fraud_rules:active"
+RULES_CACHE_LOCK = f"{RULES_CACHE_KEY}:lock"
+# Bumped by every invalidation, so a rebuild that overlapped one knows its result may be stale
+RULES_CACHE_GEN = f"{RULES_CACHE_KEY}:gen"
+RULES_REDIS_TTL = 60
+
+# (transaction field, fraud_rules column, reason label)
+BLOCKLIST_FIELDS = [
+    ("payer_ip", "blocked_ip", "Blocked IP"),
+    ("payer_browser", "blocked_payer_browser", "Blocked Browser"),
+    ("payment_gateway_bank", "blocked_payment_gateway", "Blocked Payment Gateway"),
+    ("payer_email", "blocked_email", "Blocked Email"),
+]
 
-app = fastapi.FastAPI()
+_RULES_CACHE = {"t": 0, "v": None}
+
+app = fastapi.FastAPI(default_response_class=ORJSONResponse)
 load_dotenv()
 
+# Run the autoencoder inside this process by default; set ML_INPROCESS=0 to call the ML server over HTTP
+ML_INPROCESS = os.getenv("ML_INPROCESS", "1") == "1"
+if ML_INPROCESS:
+    import mlserver
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -22,31 +64,104 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def get_db_connection():
-    return mysql.connector.connect(
+db_pool = None
+# Requests and background tasks run on a threadpool larger than the pool, so a borrower waits this long for a free connection
+DB_POOL_WAIT_SECONDS = float(os.getenv("DB_POOL_WAIT_SECONDS", 5))
+
+http_client = None
+
+def create_db_pool():
+    return pooling.MySQLConnectionPool(
+        pool_name="backend",
+        pool_size=int(os.getenv("DB_POOL_SIZE", 32)),
         host=os.getenv("DB_HOST"),
         user=os.getenv("DB_USERNAME"),
         password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_DB")
+        database=os.getenv("DB_DB"),
+        allow_local_infile=True
     )
 
-def fetch_rules():
+@app.on_event("startup")
+async def startup():
+    global http_client, db_pool
+    # Built once per worker before any request, so concurrent first requests can't each create a pool
+    db_pool = await run_in_threadpool(create_db_pool)
+    # One keep-alive pool shared by the ML and report calls
+    http_client = httpx.AsyncClient(
+        timeout=2.0,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    )
+    if ML_INPROCESS:
+        # Load and warm the model in each worker; the uvicorn supervisor only imports mlserver
+        await run_in_threadpool(mlserver.init_model)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await http_client.aclose()
+
+def get_db_connection():
+    # conn.close() hands the connection back to the pool instead of tearing it down.
+    # get_connection() fails at once on an exhausted pool, so wait for a connection to come back
+    deadline = time.monotonic() + DB_POOL_WAIT_SECONDS
+    while True:
+        try:
+            return db_pool.get_connection()
+        except mysql.connector.errors.PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.01)
+
+redis_client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_timeout=0.5)
+
+def fetch_rules_from_db():
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM fraud_rules WHERE is_active = 1")
-    rules = cursor.fetchall()
-    conn.close()
-    return rules
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM fraud_rules WHERE is_active = 1")
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+def fetch_rules():
+    try:
+        cached = redis_client.get(RULES_CACHE_KEY)
+        if cached is not None:
+            return orjson.loads(cached)
+        # Only one worker rebuilds on a miss; the rest keep serving their local copy
+        if not redis_client.set(RULES_CACHE_LOCK, 1, nx=True, ex=5) and _RULES_CACHE["v"] is not None:
+            return None
+    except redis.RedisError:
+        return fetch_rules_from_db()
+
+    rules = None
+    try:
+        with redis_client.pipeline() as pipe:
+            # Watched from before the read: an invalidation landing mid-read aborts the SET below
+            pipe.watch(RULES_CACHE_GEN)
+            rules = fetch_rules_from_db()
+            pipe.multi()
+            pipe.set(RULES_CACHE_KEY, orjson.dumps(rules, default=str), ex=RULES_REDIS_TTL)
+            pipe.delete(RULES_CACHE_LOCK)
+            pipe.execute()
+    except redis.WatchError:
+        # Don't publish a possibly stale rule set; the next miss rebuilds it
+        try:
+            redis_client.delete(RULES_CACHE_LOCK)
+        except redis.RedisError:
+            pass
+    except redis.RedisError:
+        pass
+    return rules if rules is not None else fetch_rules_from_db()
 
-def send_fraud_report(transaction_id, fraud_details):
+async def send_fraud_report(transaction_id, fraud_details):
     report_data = {
         "transaction_id": transaction_id,
         "reporting_entity_id": "system",
         "fraud_details": fraud_details
     }
     try:
-        requests.post(REPORT_API_URL, json=report_data)
-    except Exception as e:
+        await http_client.post(REPORT_API_URL, content=orjson.dumps(report_data), headers=JSON_HEADERS)
+    except Exception:
         pass
 
 class Transaction(BaseModel):
@@ -63,102 +178,249 @@ class Transaction(BaseModel):
     payer_browser: Optional[str] = None
     payee_id: Optional[str] = None
 
-def check_transaction(transaction: dict):
-    rules = fetch_rules()
-    is_fraud = False
-    fraud_reasons = []
-    transaction_id = transaction.get("transaction_id")
-    
+def compile_blocklist_patterns(patterns):
+    """Build a matcher returning the first wildcard pattern a value matches, or None."""
+    if not patterns:
+        return None
+    expressions = ["^" + ".*".join(re.escape(part) for part in pattern.split("*")) + "$" for pattern in patterns]
+
+    if hyperscan is not None:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[expression.encode() for expression in expressions],
+            ids=list(range(len(expressions))),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_DOTALL] * len(expressions)
+        )
+
+        def match(value):
+            hits = []
+            database.scan(value.encode(), match_event_handler=lambda pattern_id, *args: hits.append(pattern_id))
+            return patterns[min(hits)] if hits else None
+        return match
+
+    combined = re.compile("|".join(f"(?P<p{i}>{expression})" for i, expression in enumerate(expressions)), re.DOTALL)
+
+    def match(value):
+        found = combined.match(value)
+        return patterns[int(found.lastgroup[1:])] if found else None
+    return match
+
+def build_rule_sets(rules):
+    thresholds = []
+    blocked = {column: set() for _, column, _ in BLOCKLIST_FIELDS}
+    patterns = {column: [] for _, column, _ in BLOCKLIST_FIELDS}
+
     for rule in rules:
-        rule_type = rule.get("rule_type", "")
         threshold = rule.get("threshold", None)
-        blocked_ip = rule.get("blocked_ip", None)
-        blocked_browser = rule.get("blocked_payer_browser", None)
-        blocked_gateway = rule.get("blocked_payment_gateway", None)
-        blocked_email = rule.get("blocked_email", None)
+        if rule.get("rule_type", "") == "Threshold Value" and threshold is not None:
+            thresholds.append((float(threshold), threshold))
+        for _, column, _ in BLOCKLIST_FIELDS:
+            value = rule.get(column, None)
+            if value:
+                # Entries with a * (e.g. "*@example.com", "10.0.*") are wildcard patterns
+                if "*" in value:
+                    patterns[column].append(value)
+                else:
+                    blocked[column].add(value)
 
-        if rule_type == "Threshold Value" and threshold is not None:
-            if transaction.get("transaction_amount", 0) > float(threshold):
-                is_fraud = True
-                fraud_reasons.append(f"High transaction amount (> {threshold})")
+    thresholds.sort(key=lambda t: t[0])
+    return {
+        "thresholds": [value for value, _ in thresholds],
+        "threshold_labels": [label for _, label in thresholds],
+        "blocked": blocked,
+        "patterns": {column: compile_blocklist_patterns(values) for column, values in patterns.items()},
+    }
 
-        if blocked_ip and transaction.get("payer_ip") == blocked_ip:
-            is_fraud = True
-            fraud_reasons.append(f"Blocked IP: {blocked_ip}")
+def get_rule_sets():
+    now = time.monotonic()
+    if _RULES_CACHE["v"] is None or now - _RULES_CACHE["t"] > RULES_TTL:
+        rules = fetch_rules()
+        if rules is not None:
+            _RULES_CACHE["v"] = build_rule_sets(rules)
+        _RULES_CACHE["t"] = now
+    return _RULES_CACHE["v"]
 
-        if blocked_browser and transaction.get("payer_browser") == blocked_browser:
-            is_fraud = True
-            fraud_reasons.append(f"Blocked Browser: {blocked_browser}")
+def _apply_rules(transaction: Transaction, rule_sets, exceeded):
+    # exceeded: how many of the sorted thresholds are strictly below the amount
+    fraud_reasons = [
+        f"High transaction amount (> {threshold})" for threshold in rule_sets["threshold_labels"][:exceeded]
+    ]
+    for field, column, label in BLOCKLIST_FIELDS:
+        value = getattr(transaction, field)
+        if not value:
+            continue
+        if value in rule_sets["blocked"][column]:
+            fraud_reasons.append(f"{label}: {value}")
+        elif rule_sets["patterns"][column] is not None:
+            pattern = rule_sets["patterns"][column](value)
+            if pattern is not None:
+                fraud_reasons.append(f"{label}: {value} (matches {pattern})")
 
-        if blocked_gateway and transaction.get("payment_gateway_bank") == blocked_gateway:
-            is_fraud = True
-            fraud_reasons.append(f"Blocked Payment Gateway: {blocked_gateway}")
+    return {
+        "transaction_id": transaction.transaction_id,
+        "is_fraud_rule": len(fraud_reasons) > 0,
+        "fraud_source": "rule",
+        "fraud_reasons": fraud_reasons,
+    }
 
-        if blocked_email and transaction.get("payer_email") == blocked_email:
-            is_fraud = True
-            fraud_reasons.append(f"Blocked Email: {blocked_email}")
+def check_transaction(transaction: Transaction):
+    rule_sets = get_rule_sets()
+    exceeded = bisect_left(rule_sets["thresholds"], transaction.transaction_amount)
+    return _apply_rules(transaction, rule_sets, exceeded)
 
-    return {"transaction_id": transaction_id, "is_fraud_rule": is_fraud, "fraud_source": "rule", "fraud_reasons": fraud_reasons}
+def check_transactions(transactions: List[Transaction]):
+    rule_sets = get_rule_sets()
+    amounts = np.array([t.transaction_amount for t in transactions], dtype=np.float64)
+    exceeded = np.searchsorted(rule_sets["thresholds"], amounts, side="left")
+    return [_apply_rules(t, rule_sets, int(n)) for t, n in zip(transactions, exceeded)]
 
-def upload_transaction(transaction: Transaction,result_rule,result_predict):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    query = """
+INSERT_TRANSACTION_SQL = """
     INSERT INTO transactions (
         transaction_id_anonymous, transaction_date, transaction_amount, transaction_channel, 
         transaction_payment_mode_anonymous, payment_gateway_bank_anonymous, payer_email_anonymous, payer_mobile_anonymous, 
         payer_browser_anonymous, payee_id_anonymous, is_fraud_rule, is_fraud_predict, payee_ip_anonymous
     ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
-    values = (
+LOAD_DATA_SQL = """
+    LOAD DATA LOCAL INFILE %s INTO TABLE transactions
+    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+    LINES TERMINATED BY '\\n' (
+        transaction_id_anonymous, transaction_date, transaction_amount, transaction_channel, 
+        transaction_payment_mode_anonymous, payment_gateway_bank_anonymous, payer_email_anonymous, payer_mobile_anonymous, 
+        payer_browser_anonymous, payee_id_anonymous, is_fraud_rule, is_fraud_predict, payee_ip_anonymous
+    )
+    """
+UPLOAD_CHUNK_SIZE = 1000
+# Batches this large skip per-statement parsing entirely and use MySQL's bulk loader
+LOAD_DATA_MIN_ROWS = 5000
+
+def transaction_row(transaction: Transaction, result_rule, result_predict):
+    return (
         transaction.transaction_id, transaction.transaction_date, transaction.transaction_amount,
         transaction.transaction_channel, transaction.transaction_payment_mode, transaction.payment_gateway_bank,
         transaction.payer_email, transaction.payer_mobile,transaction.payer_browser, transaction.payee_id, result_rule,result_predict,None
     )
-    cursor.execute(query, values)
-    conn.commit()
-    conn.close()
 
-def get_ml_prediction(transaction: dict):
+def upload_transaction(transaction: Transaction,result_rule,result_predict):
+    conn = get_db_connection()
     try:
-        response = requests.post(ML_SERVER_URL, json=transaction, headers={"Content-Type": "application/json"})
+        cursor = conn.cursor()
+        cursor.execute(INSERT_TRANSACTION_SQL, transaction_row(transaction, result_rule, result_predict))
+        conn.commit()
+    finally:
+        conn.close()
+
+def _load_data_value(value):
+    # LOAD DATA reads \N as NULL and treats backslash as its escape character
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str):
+        return value.replace("\\", "\\\\")
+    return value
+
+def _load_data_infile(cursor, rows: List[tuple]):
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerows(tuple(_load_data_value(v) for v in row) for row in rows)
+        f.flush()
+        cursor.execute(LOAD_DATA_SQL, (f.name,))
+
+def upload_transactions_bulk(rows: List[tuple]):
+    conn = get_db_connection()
+    # Any failure still hands the connection back to the pool
+    try:
+        cursor = conn.cursor()
+        if len(rows) >= LOAD_DATA_MIN_ROWS:
+            try:
+                _load_data_infile(cursor, rows)
+                conn.commit()
+                return
+            except mysql.connector.Error:
+                # The server may have local_infile disabled; fall back to batched INSERTs
+                conn.rollback()
+        # executemany rewrites each chunk into one multi-row INSERT, parsed once per chunk
+        for start in range(0, len(rows), UPLOAD_CHUNK_SIZE):
+            cursor.executemany(INSERT_TRANSACTION_SQL, rows[start:start + UPLOAD_CHUNK_SIZE])
+        conn.commit()
+    finally:
+        conn.close()
+
+async def get_ml_prediction(transaction: dict):
+    try:
+        if ML_INPROCESS:
+            return await run_in_threadpool(mlserver.predict_fraud, transaction)
+        response = await http_client.post(ML_SERVER_URL, content=orjson.dumps(transaction), headers=JSON_HEADERS)
         response.raise_for_status()
-        prediction = response.json().get("prediction", [])[0]  # Extract first prediction from the list
-        return prediction
-    except Exception as e:
+        return orjson.loads(response.content).get("is_fraud")
+    except Exception:
         return None
 
+async def get_ml_predictions(transactions: List[dict]):
+    try:
+        if ML_INPROCESS:
+            return await run_in_threadpool(mlserver.predict_fraud_batch, transactions)
+        response = await http_client.post(ML_BATCH_URL, content=orjson.dumps({"transactions": transactions}), headers=JSON_HEADERS)
+        response.raise_for_status()
+        return [p.get("is_fraud") for p in orjson.loads(response.content).get("predictions", [])]
+    except Exception:
+        return [None] * len(transactions)
+
+async def score_and_upload(transaction: Transaction, result_rule):
+    # Rule hits skip the model on the response path; score them here so the stored row still carries
+    # the model's verdict, which the dashboard compares against the rule label
+    result_predict = await get_ml_prediction(transaction.model_dump())
+    await run_in_threadpool(upload_transaction, transaction, result_rule, result_predict)
+
+async def score_and_upload_bulk(transactions: List[Transaction], rows: List[tuple], rule_hits: List[int]):
+    # Same as score_and_upload for the batch endpoint: fill in predictions for the rule hits, then insert
+    predictions = await get_ml_predictions([transactions[i].model_dump() for i in rule_hits])
+    for i, prediction in zip(rule_hits, predictions):
+        rows[i] = transaction_row(transactions[i], True, prediction)
+    await run_in_threadpool(upload_transactions_bulk, rows)
+
 @app.get("/")
 def hello():
     return {"response":"hello"}
 
 @app.post("/detect")
-def detect(transaction: Transaction):
-    transaction_dict = transaction.dict()
-    result = check_transaction(transaction_dict)
-    ml_prediction = get_ml_prediction(transaction_dict)
-    result["is_fraud_predicted"] = ml_prediction
+async def detect(transaction: Transaction, background_tasks: BackgroundTasks):
+    result = await run_in_threadpool(check_transaction, transaction)
+    # A rule hit is already conclusive, so the model is only consulted for the rest
+    result["is_fraud_predicted"] = None if result["is_fraud_rule"] else await get_ml_prediction(transaction.model_dump())
+    # Reporting and persisting don't affect the response, so run them after it is sent
     if result["is_fraud_rule"] or result["is_fraud_predicted"]:
-        send_fraud_report(transaction.transaction_id, ", ".join(result["fraud_reasons"]))
-    upload_transaction(transaction, result["is_fraud_rule"],result["is_fraud_predicted"])
+        background_tasks.add_task(send_fraud_report, transaction.transaction_id, ", ".join(result["fraud_reasons"]))
+    if result["is_fraud_rule"]:
+        background_tasks.add_task(score_and_upload, transaction, result["is_fraud_rule"])
+    else:
+        background_tasks.add_task(upload_transaction, transaction, result["is_fraud_rule"], result["is_fraud_predicted"])
     return result
 
 class BatchTransactionRequest(BaseModel):
     transactions: List[Transaction]
 
 @app.post("/batchdetect")
-def batch_detect(request: BatchTransactionRequest):
+async def batch_detect(request: BatchTransactionRequest, background_tasks: BackgroundTasks):
     results = []
+    rule_results = await run_in_threadpool(check_transactions, request.transactions)
+    # Only transactions the rules let through are sent to the model
+    needs_ml = [i for i, result in enumerate(rule_results) if not result["is_fraud_rule"]]
+    ml_predictions = [None] * len(rule_results)
+    if needs_ml:
+        predictions = await get_ml_predictions([request.transactions[i].model_dump() for i in needs_ml])
+        for i, prediction in zip(needs_ml, predictions):
+            ml_predictions[i] = prediction
+
+    rows = []
 
-    for transaction in request.transactions:
-        transaction_dict = transaction.dict()
-        result = check_transaction(transaction_dict)
-        ml_prediction = get_ml_prediction(transaction_dict)
+    for transaction, result, ml_prediction in zip(request.transactions, rule_results, ml_predictions):
         result["is_fraud_predicted"] = ml_prediction
         
-        upload_transaction(transaction, result["is_fraud_rule"], result["is_fraud_predicted"])
+        rows.append(transaction_row(transaction, result["is_fraud_rule"], result["is_fraud_predicted"]))
         if result["is_fraud_rule"] or result["is_fraud_predicted"]:
-            send_fraud_report(transaction.transaction_id, ", ".join(result["fraud_reasons"]))
+            background_tasks.add_task(send_fraud_report, transaction.transaction_id, ", ".join(result["fraud_reasons"]))
         results.append({
             "transaction_id": transaction.transaction_id,
             "is_fraud_rule": result["is_fraud_rule"],
@@ -166,10 +428,27 @@ def batch_detect(request: BatchTransactionRequest):
             "fraud_reasons": ", ".join(result["fraud_reasons"])
         })
 
+    if rows:
+        rule_hits = [i for i, result in enumerate(rule_results) if result["is_fraud_rule"]]
+        if rule_hits:
+            background_tasks.add_task(score_and_upload_bulk, request.transactions, rows, rule_hits)
+        else:
+            background_tasks.add_task(upload_transactions_bulk, rows)
     return {"transactions": results}
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # With the model in-process each worker also runs mlserver.INTRA_OP_THREADS TensorFlow threads
+    default_workers = mlserver.default_workers() if ML_INPROCESS else os.cpu_count() or 1
+    uvicorn.run(
+        "backend-server:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", default_workers)),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
 
 
@@ -0,0 +1,91 @@
+"""
+Export inference-optimized copies of the autoencoder.
+
+Always writes model_best_folded.keras, with each BatchNormalization folded into
+the Dense layer before it and Dropout removed. When a training CSV is given,
+also writes a full-integer model_best_int8.tflite calibrated on it.
+mlserver.py picks up both files automatically once they exist.
+
+Usage:
+    python export_model.py [transactions_train.csv]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+import mlserver
+from mlserver import FOLDED_MODEL_PATH, TFLITE_MODEL_PATH, vectorize
+
+
+def fold_batchnorm(model):
+    """Rebuild a Sequential model with Dense+BatchNormalization pairs merged."""
+    folded = []
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.layers.Dropout):
+            continue  # identity at inference time
+        previous = folded[-1][0] if folded else None
+        if (isinstance(layer, tf.keras.layers.BatchNormalization)
+                and isinstance(previous, tf.keras.layers.Dense)
+                and previous.get_config()["activation"] == "linear"):
+            weights = folded[-1][1]
+            kernel = weights[0]
+            bias = weights[1] if len(weights) > 1 else np.zeros(kernel.shape[-1], dtype=kernel.dtype)
+            gamma = layer.gamma.numpy() if layer.scale else 1.0
+            beta = layer.beta.numpy() if layer.center else 0.0
+            factor = gamma / np.sqrt(layer.moving_variance.numpy() + layer.epsilon)
+            # W' = W * gamma / sqrt(var + eps), b' = (b - mean) * gamma / sqrt(var + eps) + beta
+            folded[-1] = (previous, [kernel * factor, (bias - layer.moving_mean.numpy()) * factor + beta])
+            continue
+        folded.append((layer, layer.get_weights()))
+
+    rebuilt = tf.keras.Sequential([tf.keras.Input(shape=model.input_shape[1:])])
+    for layer, weights in folded:
+        config = layer.get_config()
+        if isinstance(layer, tf.keras.layers.Dense):
+            config["use_bias"] = True
+        new_layer = layer.__class__.from_config(config)
+        rebuilt.add(new_layer)
+        new_layer.set_weights(weights)
+    return rebuilt
+
+
+def load_samples(csv_path, limit):
+    """Vectorize up to `limit` training rows to calibrate the int8 ranges."""
+    df = pd.read_csv(csv_path, nrows=limit).dropna()
+    # Training exports use *_anonymous column names; the API payload does not
+    df.columns = [col.replace("_anonymous", "") for col in df.columns]
+    return np.stack([vectorize(row) for row in df.to_dict(orient="records")])
+
+
+def quantize_int8(model, samples):
+    def representative_dataset():
+        for row in samples:
+            yield [row[np.newaxis, :]]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path", nargs="?", help="CSV of training transactions used for int8 calibration")
+    parser.add_argument("--samples", type=int, default=500, help="Number of rows used for calibration")
+    args = parser.parse_args()
+
+    # Only the model and encodings are needed here, not the serving warmup
+    mlserver.load_model()
+    model = mlserver.MODEL
+    folded = fold_batchnorm(model)
+    folded.save(FOLDED_MODEL_PATH)
+    print(f"Wrote {FOLDED_MODEL_PATH} ({len(model.layers)} -> {len(folded.layers)} layers)")
+
+    if args.csv_path:
+        tflite_model = quantize_int8(folded, load_samples(args.csv_path, args.samples))
+        with open(TFLITE_MODEL_PATH, "wb") as f:
+            f.write(tflite_model)
+        print(f"Wrote {TFLITE_MODEL_PATH} ({len(tflite_model) / 1024:.1f} KiB)")
@@ -1,12 +1,34 @@
+import os
+
+INTRA_OP_THREADS = int(os.getenv("TF_NUM_INTRAOP_THREADS", 2))
+INTER_OP_THREADS = int(os.getenv("TF_NUM_INTEROP_THREADS", 1))
+
+# Must be set before TensorFlow is imported; keeps idle TF/OpenMP threads from spinning
+os.environ.setdefault("TF_XLA_FLAGS", "--tf_xla_auto_jit=2")
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+os.environ.setdefault("TF_GPU_THREAD_MODE", "gpu_private")
+os.environ.setdefault("OMP_WAIT_POLICY", "PASSIVE")
+
 from fastapi import FastAPI, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
+from fastapi.responses import ORJSONResponse
 import uvicorn
 import joblib
+import threading
 import tensorflow as tf
 import numpy as np
 
-app = FastAPI(title="TransactAI")
+# Optional: Numba compiles the batch feature builder into a parallel native loop
+try:
+    import numba
+except ImportError:
+    numba = None
+
+tf.config.threading.set_intra_op_parallelism_threads(INTRA_OP_THREADS)
+tf.config.threading.set_inter_op_parallelism_threads(INTER_OP_THREADS)
+
+app = FastAPI(title="TransactAI", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,58 +44,252 @@ def load_encodings():
     one_hot_columns = joblib.load("one_hot_columns.pkl")
     return scaler, freq_encodings, one_hot_columns
 
-def preprocess_data(df):
-    df.drop(columns=['transaction_id', 'payer_mobile', 'is_fraud', 'transaction_date'], inplace=True, errors='ignore')
-    scaler, freq_encodings, one_hot_columns = load_encodings()
-
-    df = pd.get_dummies(df, columns=['transaction_channel', 'transaction_payment_mode'])
-
-    for col in one_hot_columns:
-        if col not in df.columns:
-            df[col] = 0
-    df = df[one_hot_columns]
-
-    freq_cols = ["payer_email", "payee_ip", "payee_id", "payment_gateway_bank", "payer_browser"]
-    for col, mapping_key in zip(freq_cols, freq_encodings.keys()):
-        if col in df.columns:
-            df[col] = df[col].map(freq_encodings[mapping_key]).fillna(0)
-            df.rename(columns={col: f"{col}_encoded"}, inplace=True)
-
-    scale_cols = [
-        'transaction_amount', 
-        'payer_email_encoded', 
-        'payee_ip_encoded', 
-        'payee_id_encoded', 
-        'payment_gateway_bank_encoded', 
-        'payer_browser_encoded'
-    ]
-    for col in scale_cols:
-        if col not in df.columns:
-            df[col] = 0
-
-    if df.empty:
-        raise ValueError("Processed DataFrame is empty after transformations.")
-
-    df[scale_cols] = scaler.transform(df[scale_cols])
-    return df
-
-def predict(df_input):
-    model = tf.keras.models.load_model("model_best.keras")
-    reconstructed = model.predict(df_input)
-    loss = tf.keras.losses.mae(reconstructed.astype(np.float32), df_input.astype(np.float32))
-    return tf.math.less(loss, 0.264895)
+THRESHOLD = 0.264895
+MODEL_PATH = "model_best.keras"
+FOLDED_MODEL_PATH = "model_best_folded.keras"
+TFLITE_MODEL_PATH = "model_best_int8.tflite"
+
+# Prefer the int8 model written by export_model.py when it is present
+USE_TFLITE = os.getenv("ML_USE_TFLITE", "1") == "1" and os.path.exists(TFLITE_MODEL_PATH)
+_tflite_lock = threading.Lock()
+
+ONE_HOT_PREFIXES = {
+    "transaction_channel": "transaction_channel",
+    "transaction_payment_mode": "transaction_payment_mode_anonymous",
+}
+FREQ_COLS = ["payer_email", "payer_ip", "payee_id", "payment_gateway_bank", "payer_browser"]
+
+# Batches up to this size reuse a per-thread input buffer and are compiled by warmup()
+MAX_BATCH = int(os.getenv("ML_MAX_BATCH", 256))
+WARMUP_RUNS = 3
+_buffers = threading.local()
+
+# Model state is filled in by load_model(), not at import: uvicorn's supervisor imports this module
+# too, and only the workers that serve requests should pay for the load and the warmup
+MODEL = None
+SCALER = FREQ_ENCODINGS = ONE_HOT_COLUMNS = None
+N_FEATURES = 0
+_infer = None
+INTERPRETER = TFLITE_INPUT = TFLITE_OUTPUT = None
+COL_INDEX = FREQ_MAPS = None
+SCALE_IDX = SCALE = SCALE_MIN = None
+AMOUNT_IDX = FREQ_IDX = None
+_init_lock = threading.Lock()
+_loaded = False
+_warmed = False
+
+def _normal(x):
+    reconstructed = MODEL(x, training=False)
+    loss = tf.reduce_mean(tf.abs(reconstructed - x), axis=1)
+    return loss < THRESHOLD
+
+def load_model():
+    """Load the model, encodings and lookup tables once per process; later calls return immediately."""
+    global _loaded, MODEL, SCALER, FREQ_ENCODINGS, ONE_HOT_COLUMNS, N_FEATURES, _infer
+    global INTERPRETER, TFLITE_INPUT, TFLITE_OUTPUT
+    global COL_INDEX, FREQ_MAPS, SCALE_IDX, SCALE, SCALE_MIN, AMOUNT_IDX, FREQ_IDX
+    if _loaded:
+        return
+    with _init_lock:
+        if _loaded:
+            return
+        # export_model.py writes a copy with BatchNormalization folded into the Dense layers
+        MODEL = tf.keras.models.load_model(FOLDED_MODEL_PATH if os.path.exists(FOLDED_MODEL_PATH) else MODEL_PATH)
+        SCALER, FREQ_ENCODINGS, ONE_HOT_COLUMNS = load_encodings()
+        N_FEATURES = len(ONE_HOT_COLUMNS)
+        _infer = tf.function(_normal, jit_compile=True, input_signature=[tf.TensorSpec([None, N_FEATURES], tf.float32)])
+
+        if USE_TFLITE:
+            INTERPRETER = tf.lite.Interpreter(model_path=TFLITE_MODEL_PATH, num_threads=INTRA_OP_THREADS)
+            INTERPRETER.allocate_tensors()
+            TFLITE_INPUT = INTERPRETER.get_input_details()[0]
+            TFLITE_OUTPUT = INTERPRETER.get_output_details()[0]
+
+        COL_INDEX = {name: i for i, name in enumerate(ONE_HOT_COLUMNS)}
+        FREQ_MAPS = [
+            (col, COL_INDEX[f"{col}_encoded"], FREQ_ENCODINGS[key].to_dict())
+            for col, key in zip(FREQ_COLS, FREQ_ENCODINGS.keys())
+        ]
+        SCALE_IDX = np.array([COL_INDEX[col] for col in SCALER.feature_names_in_])
+        SCALE = SCALER.scale_.astype(np.float32)
+        SCALE_MIN = SCALER.min_.astype(np.float32)
+        AMOUNT_IDX = COL_INDEX["transaction_amount"]
+        FREQ_IDX = np.array([index for _, index, _ in FREQ_MAPS])
+        _loaded = True
+
+def init_model():
+    """Load the model and compile every batch shape; run from each worker's startup hook."""
+    global _warmed
+    if _warmed:
+        return
+    load_model()
+    with _init_lock:
+        if not _warmed:
+            warmup()
+            _warmed = True
+
+def default_workers():
+    """Worker count when WEB_CONCURRENCY is unset: one per INTRA_OP_THREADS cores, or one on a GPU host."""
+    # Every worker would load its own copy of the model onto the GPU, so a GPU host runs one worker
+    if tf.config.list_physical_devices("GPU"):
+        return 1
+    return max(1, (os.cpu_count() or 1) // INTRA_OP_THREADS)
+
+def _infer_tflite(x):
+    in_scale, in_zero = TFLITE_INPUT["quantization"]
+    out_scale, out_zero = TFLITE_OUTPUT["quantization"]
+    quantized = np.clip(np.round(x / in_scale + in_zero), -128, 127).astype(np.int8)
+
+    # The interpreter holds its tensors internally, so calls must not overlap
+    with _tflite_lock:
+        if tuple(INTERPRETER.get_input_details()[0]["shape"]) != x.shape:
+            INTERPRETER.resize_tensor_input(TFLITE_INPUT["index"], x.shape)
+            INTERPRETER.allocate_tensors()
+        INTERPRETER.set_tensor(TFLITE_INPUT["index"], quantized)
+        INTERPRETER.invoke()
+        output = INTERPRETER.get_tensor(TFLITE_OUTPUT["index"])
+
+    reconstructed = (output.astype(np.float32) - out_zero) * out_scale
+    return np.abs(reconstructed - x).mean(axis=1) < THRESHOLD
+
+def _bucket(n):
+    # XLA compiles one executable per input shape, so pad the batch to a power of two
+    size = 1
+    while size < n:
+        size *= 2
+    return size
+
+def vectorize_into(api_data: dict, x: np.ndarray) -> np.ndarray:
+    # x must be a zeroed float32 row of length N_FEATURES
+    x[COL_INDEX["transaction_amount"]] = float(api_data.get("transaction_amount") or 0)
+
+    for field, prefix in ONE_HOT_PREFIXES.items():
+        index = COL_INDEX.get(f"{prefix}_{api_data.get(field)}")
+        if index is not None:
+            x[index] = 1
+
+    for col, index, counts in FREQ_MAPS:
+        x[index] = counts.get(api_data.get(col), 0)
+
+    # MinMaxScaler.transform: X * scale_ + min_
+    x[SCALE_IDX] = x[SCALE_IDX] * SCALE + SCALE_MIN
+    return x
+
+def vectorize(api_data: dict) -> np.ndarray:
+    return vectorize_into(api_data, np.zeros(N_FEATURES, dtype=np.float32))
+
+def _fill_rows(out, amounts, one_hot_idx, freq_values, amount_idx, freq_idx, scale_idx, scale, scale_min):
+    # Rows of out must be zeroed; one_hot_idx holds -1 where a category has no column
+    n = amounts.shape[0]
+    out[:n, amount_idx] = amounts
+    rows, fields = np.nonzero(one_hot_idx >= 0)
+    out[rows, one_hot_idx[rows, fields]] = 1
+    out[:n, freq_idx] = freq_values
+    out[:n, scale_idx] = out[:n, scale_idx] * scale + scale_min
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True, fastmath=True)
+    def _fill_rows(out, amounts, one_hot_idx, freq_values, amount_idx, freq_idx, scale_idx, scale, scale_min):
+        for r in numba.prange(amounts.shape[0]):
+            out[r, amount_idx] = amounts[r]
+            for j in range(one_hot_idx.shape[1]):
+                if one_hot_idx[r, j] >= 0:
+                    out[r, one_hot_idx[r, j]] = 1
+            for j in range(freq_idx.shape[0]):
+                out[r, freq_idx[j]] = freq_values[r, j]
+            for j in range(scale_idx.shape[0]):
+                out[r, scale_idx[j]] = out[r, scale_idx[j]] * scale[j] + scale_min[j]
+
+def vectorize_batch_into(transactions: list, out: np.ndarray) -> np.ndarray:
+    # The dict lookups stay in Python; the numeric fill runs in _fill_rows
+    amounts = np.array([float(t.get("transaction_amount") or 0) for t in transactions], dtype=np.float32)
+    one_hot_idx = np.array(
+        [[COL_INDEX.get(f"{prefix}_{t.get(field)}", -1) for field, prefix in ONE_HOT_PREFIXES.items()] for t in transactions],
+        dtype=np.int64
+    ).reshape(len(transactions), len(ONE_HOT_PREFIXES))
+    freq_values = np.array(
+        [[counts.get(t.get(col), 0) for col, _, counts in FREQ_MAPS] for t in transactions],
+        dtype=np.float32
+    ).reshape(len(transactions), len(FREQ_MAPS))
+    _fill_rows(out, amounts, one_hot_idx, freq_values, AMOUNT_IDX, FREQ_IDX, SCALE_IDX, SCALE, SCALE_MIN)
+    return out
+
+def _input_buffer(rows):
+    # Requests run on the threadpool concurrently, so each thread fills its own buffer
+    buf = getattr(_buffers, "x", None)
+    if buf is None or buf.shape[0] < rows:
+        buf = np.zeros((max(rows, MAX_BATCH), N_FEATURES), dtype=np.float32)
+        _buffers.x = buf
+    view = buf[:rows]
+    view.fill(0)
+    return view
+
+def _score(padded, n):
+    if USE_TFLITE:
+        return _infer_tflite(padded)[:n]
+    return _infer(tf.constant(padded)).numpy()[:n]
+
+def warmup():
+    # Compile every padded batch shape up front so no request pays the XLA compile
+    size = 1
+    while size <= _bucket(MAX_BATCH):
+        for _ in range(WARMUP_RUNS):
+            _score(np.zeros((size, N_FEATURES), dtype=np.float32), size)
+        size *= 2
+    # Leave the TFLite interpreter sized for the common single-row request
+    _score(np.zeros((1, N_FEATURES), dtype=np.float32), 1)
+    # Triggers the Numba compile (or loads it from cache) before the first batch
+    vectorize_batch_into([{}], np.zeros((1, N_FEATURES), dtype=np.float32))
+
+def predict_fraud(api_data: dict) -> int:
+    init_model()
+    padded = _input_buffer(1)
+    vectorize_into(api_data, padded[0])
+    return int(_score(padded, 1)[0]) ^ 1
+
+def predict_fraud_batch(transactions: list) -> list:
+    if not transactions:
+        return []
+    init_model()
+    n = len(transactions)
+    padded = _input_buffer(_bucket(n))
+    vectorize_batch_into(transactions, padded)
+    return [int(normal) ^ 1 for normal in _score(padded, n)]
+
+@app.on_event("startup")
+async def startup():
+    # Runs in each worker, never in the supervisor, so the model is loaded once per serving process
+    await run_in_threadpool(init_model)
 
 @app.post("/mlpredict")
 async def ml_predict(api_data: dict = Body(...)):
-    df = pd.DataFrame([api_data])
-    processed = preprocess_data(df)
-    prediction = predict(processed)
-    result = int(prediction.numpy()[0]) ^ 1
+    result = await run_in_threadpool(predict_fraud, api_data)
     return {
         "transaction_id": api_data.get("transaction_id", ""),
         "is_fraud": result
     }
 
+@app.post("/mlpredict_batch")
+async def ml_predict_batch(api_data: dict = Body(...)):
+    transactions = api_data.get("transactions", [])
+    results = await run_in_threadpool(predict_fraud_batch, transactions)
+    return {
+        "predictions": [
+            {"transaction_id": t.get("transaction_id", ""), "is_fraud": result}
+            for t, result in zip(transactions, results)
+        ]
+    }
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8100)
+    # Each worker gets INTRA_OP_THREADS TensorFlow threads, so together they fill the cores
+    uvicorn.run(
+        "mlserver:app",
+        host="0.0.0.0",
+        port=8100,
+        workers=int(os.getenv("WEB_CONCURRENCY", default_workers())),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
 
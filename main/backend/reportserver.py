@@ -1,21 +1,45 @@
-import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
 import os
+import time
 from dotenv import load_dotenv
 import fastapi
 import uvicorn
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-app = fastapi.FastAPI()
+app = fastapi.FastAPI(default_response_class=ORJSONResponse)
 load_dotenv()
 
-def get_db_connection():
-    return mysql.connector.connect(
+db_pool = None
+# Sync endpoints run on a threadpool larger than the pool, so a borrower waits this long for a free connection
+DB_POOL_WAIT_SECONDS = float(os.getenv("DB_POOL_WAIT_SECONDS", 5))
+
+@app.on_event("startup")
+def startup():
+    global db_pool
+    # Built once per worker before any request, so concurrent first requests can't each create a pool
+    db_pool = pooling.MySQLConnectionPool(
+        pool_name="report",
+        pool_size=int(os.getenv("DB_POOL_SIZE", 32)),
         host=os.getenv("DB_HOST"),
         user=os.getenv("DB_USERNAME"),
         password=os.getenv("DB_PASSWORD"),
         database=os.getenv("DB_DB")
     )
 
+def get_db_connection():
+    # conn.close() hands the connection back to the pool instead of tearing it down.
+    # get_connection() fails at once on an exhausted pool, so wait for a connection to come back
+    deadline = time.monotonic() + DB_POOL_WAIT_SECONDS
+    while True:
+        try:
+            return db_pool.get_connection()
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.01)
+
 class FraudReport(BaseModel):
     transaction_id: str
     reporting_entity_id: str
@@ -25,23 +49,35 @@ class FraudReport(BaseModel):
 def report_fraud(report: FraudReport):
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        query = """
-        INSERT INTO fraud_reporting (
-            transaction_id, reporting_entity_id, fraud_details, is_fraud_reported
-        ) VALUES (%s, %s, %s, %s)
-        """
-        
-        values = (report.transaction_id, report.reporting_entity_id, report.fraud_details, True)
-        cursor.execute(query, values)
-        conn.commit()
-        conn.close()
-        
+        try:
+            cursor = conn.cursor()
+
+            query = """
+            INSERT INTO fraud_reporting (
+                transaction_id, reporting_entity_id, fraud_details, is_fraud_reported
+            ) VALUES (%s, %s, %s, %s)
+            """
+
+            values = (report.transaction_id, report.reporting_entity_id, report.fraud_details, True)
+            cursor.execute(query, values)
+            conn.commit()
+        finally:
+            # Back to the pool even when the insert fails
+            conn.close()
+
         return {"transaction_id": report.transaction_id, "reporting_acknowledged": True, "failure_code": 0}
     
-    except Exception as e:
+    except Exception:
         return {"transaction_id": report.transaction_id, "reporting_acknowledged": False, "failure_code": 1}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8200)
+    uvicorn.run(
+        "reportserver:app",
+        host="0.0.0.0",
+        port=8200,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
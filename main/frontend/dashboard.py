@@ -4,15 +4,22 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from sklearn.metrics import confusion_matrix, precision_score, recall_score
 import io
 import os
+import queue
 import threading
 import time
 import logging
-from utils import filter_data, process_data, calculate_metrics, get_time_granularity
+import pyarrow.parquet as pq
+from utils import filter_data, process_data, process_data_arrow, get_time_granularity, content_hash, count_confusion, REQUIRED_COLUMNS, DAY_COLUMN, TID_LOWER_COLUMN
 from dotenv import load_dotenv
 
+# Optional: Polars runs the per-dimension group-bys multi-threaded on Arrow buffers
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -50,758 +57,814 @@ except ImportError:
         USE_DATABASE = False
         logger.warning("No real-time data source available")
 
-# Set page configuration
-st.set_page_config(
-    page_title="Fraud Analysis Dashboard",
-    page_icon="🔍",
-    layout="wide"
-)
-
 # Constants
 DATA_DIR = "data"
-LATEST_DATA_FILE = os.path.join(DATA_DIR, "latest_transactions.csv")
-HISTORY_FILE = os.path.join(DATA_DIR, "transaction_history.csv")
+LATEST_DATA_FILE = os.path.join(DATA_DIR, "latest_transactions.parquet")
+HISTORY_FILE = os.path.join(DATA_DIR, "transaction_history.parquet")
+
+# Only the columns the dashboard uses are read
+HISTORY_COLUMNS = list(REQUIRED_COLUMNS)
+# Quiet databases are polled less often: the interval doubles per unchanged poll up to this cap
+MAX_POLL_INTERVAL = 60
+# How long a new session waits for the background poller's first result before falling back to the file
+INITIAL_POLL_TIMEOUT = 5
+MAX_FILTER_OPTIONS = 10_000
 
 # Create data directory if it doesn't exist
 os.makedirs(DATA_DIR, exist_ok=True)
 
-# Initialize session state for filters and data
-if 'data' not in st.session_state:
-    st.session_state.data = None
-if 'date_range' not in st.session_state:
-    st.session_state.date_range = None
-if 'payer_id' not in st.session_state:
-    st.session_state.payer_id = None
-if 'payee_id' not in st.session_state:
-    st.session_state.payee_id = None
-if 'transaction_id' not in st.session_state:
-    st.session_state.transaction_id = ""
-if 'metrics_date_range' not in st.session_state:
-    st.session_state.metrics_date_range = None
-if 'last_refresh_time' not in st.session_state:
-    st.session_state.last_refresh_time = datetime.now()
-if 'auto_refresh' not in st.session_state:
-    st.session_state.auto_refresh = True
-if 'refresh_interval' not in st.session_state:
-    st.session_state.refresh_interval = 5  # Default refresh interval in seconds
+
+def init_session_state():
+    """Initialize session state for filters and data."""
+    if 'data' not in st.session_state:
+        st.session_state.data = None
+    if 'date_range' not in st.session_state:
+        st.session_state.date_range = None
+    if 'payer_id' not in st.session_state:
+        st.session_state.payer_id = None
+    if 'payee_id' not in st.session_state:
+        st.session_state.payee_id = None
+    if 'transaction_id' not in st.session_state:
+        st.session_state.transaction_id = ""
+    if 'metrics_date_range' not in st.session_state:
+        st.session_state.metrics_date_range = None
+    if 'last_refresh_time' not in st.session_state:
+        st.session_state.last_refresh_time = datetime.now()
+    if 'auto_refresh' not in st.session_state:
+        st.session_state.auto_refresh = True
+    if 'refresh_interval' not in st.session_state:
+        st.session_state.refresh_interval = 5  # Default refresh interval in seconds
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_history(path, mtime, size):
+    # mtime and size only key the cache, so an unchanged file is never parsed twice.
+    # cache_resource hands every rerun the same frame without copying it, so callers must not mutate it
+    # The history is already typed Parquet: read just the dashboard columns and fix them up on the Arrow side
+    return process_data_arrow(pq.read_table(path, columns=HISTORY_COLUMNS))
+
+
+def load_history():
+    """Load the processed transaction history, re-parsing only when the file changed."""
+    return _load_history(HISTORY_FILE, os.path.getmtime(HISTORY_FILE), os.path.getsize(HISTORY_FILE))
+
+
+def history_signature(data):
+    """O(1) summary of a history snapshot; the export is ordered newest first."""
+    if data is None or data.empty:
+        return None
+    return len(data), data['Transaction_ID'].iat[0], data['Timestamp'].iat[0]
+
+
+def _poll_db_loop(state):
+    # Runs on the background thread: all MySQL and file work for real-time data happens here
+    while True:
+        try:
+            state['last_ok'] = update_transactions()
+            data = load_history() if state['last_ok'] and os.path.exists(HISTORY_FILE) else None
+            signature = history_signature(data)
+            if signature is not None and signature != state['signature']:
+                state['signature'] = signature
+                # A single reference swap, so sessions never see a half-built frame
+                state['data'] = data
+                state['consecutive_empty'] = 0
+            else:
+                state['consecutive_empty'] += 1
+        except Exception as e:
+            logger.error(f"Error in database poller: {e}")
+            state['errors'].put(e)
+        state['ready'].set()
+        time.sleep(min(state['interval'] * 2 ** state['consecutive_empty'], MAX_POLL_INTERVAL))
+
+
+@st.cache_resource
+def _db_poller():
+    # One poller per server process, shared by every session, so sibling tabs don't each hit the database
+    state = {
+        'interval': 5,
+        'last_ok': False,
+        'consecutive_empty': 0,
+        'signature': None,
+        'data': None,
+        'ready': threading.Event(),
+        'errors': queue.Queue()
+    }
+    threading.Thread(target=_poll_db_loop, args=(state,), name="db-poller", daemon=True).start()
+    return state
+
+
+def poll_database(timeout=None):
+    """
+    Get the latest transaction history published by the background database poller.
+
+    Args:
+        timeout (float): Seconds to wait for the poller's first result, if it has none yet
+
+    Returns:
+        DataFrame: The newest history snapshot, or None if nothing has been loaded yet
+    """
+    state = _db_poller()
+    state['interval'] = st.session_state.refresh_interval
+    if timeout:
+        state['ready'].wait(timeout)
+    # Surface poller failures in the session that asks next
+    if not state['errors'].empty():
+        raise state['errors'].get_nowait()
+    return state['data']
+
+
+def load_transactions(source, timeout=None):
+    """
+    Load the current transaction history from one source.
+
+    Args:
+        source (str): 'db' for the background database poller, 'file' for HISTORY_FILE
+        timeout (float): Seconds to wait for the poller's first result ('db' only)
+
+    Returns:
+        DataFrame: Processed transaction history, or None if the source has none yet
+    """
+    if source == 'db':
+        return poll_database(timeout)
+    if os.path.exists(HISTORY_FILE):
+        return load_history()
+    return None
 
 
 # Function to check for and load new data
 def check_for_new_data():
     """Check if new data is available and load it if it is."""
     try:
-        # If using database, proactively check for updates
-        if USE_DATABASE:
-            if update_transactions():
-                # After updating data files, load the new data
-                if os.path.exists(HISTORY_FILE):
-                    new_data = pd.read_csv(HISTORY_FILE)
-                    st.session_state.data = new_data
-                    st.success("Real-time data updated successfully from database!")
-                    return True
-
-        # Otherwise check for updates via the flag
-        elif has_new_data():
-            # Load new data from the latest transactions file
-            if os.path.exists(HISTORY_FILE):
-                new_data = pd.read_csv(HISTORY_FILE)
-                st.session_state.data = new_data
-                st.success("Real-time data updated successfully!")
-
-                # Reset the new data flag
-                reset_new_data_flag()
-                return True
+        # Without a database, only reload when the API has flagged new data
+        if not USE_DATABASE and not has_new_data():
+            return False
+
+        new_data = load_transactions('db' if USE_DATABASE else 'file')
+        if not USE_DATABASE:
+            reset_new_data_flag()
+        if new_data is not None and history_signature(new_data) != history_signature(st.session_state.data):
+            st.session_state.data = new_data
+            st.success("Real-time data updated successfully!")
+            return True
     except Exception as e:
         st.error(f"Error loading new data: {str(e)}")
         logger.error(f"Error in check_for_new_data: {e}")
     return False
 
 
-# Header
-st.title("Fraud Analysis Dashboard")
+def data_fingerprint(data):
+    """Content key for a loaded data snapshot; session data is replaced, never mutated in place."""
+    # Content only, no id(): an uploaded file is re-processed into a new frame on every rerun.
+    # process_data stores the hash in attrs, so this only hashes frames from other sources
+    digest = data.attrs.get('content_hash')
+    if digest is None:
+        digest = content_hash(data)
+    return len(data), digest
+
+
+def _sorted_ids(ids):
+    # process_data stores IDs as categoricals, whose categories are already the unique values
+    categories = ids.cat.categories if isinstance(ids.dtype, pd.CategoricalDtype) else pd.Index(ids.unique())
+    # Streamlit multiselect slows down badly past this many options
+    return categories.astype(str).sort_values()[:MAX_FILTER_OPTIONS].tolist()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def filter_options(fingerprint, _data):
+    """Sidebar filter choices for one data snapshot, keyed by its fingerprint rather than a full hash."""
+    # process_data records the time span in attrs; frames from other sources are scanned
+    ts_min = _data.attrs.get('ts_min') or _data['Timestamp'].min()
+    ts_max = _data.attrs.get('ts_max') or _data['Timestamp'].max()
+    return {
+        'min_date': pd.Timestamp(ts_min).date(),
+        'max_date': pd.Timestamp(ts_max).date(),
+        'payer_ids': _sorted_ids(_data['Payer_ID']),
+        'payee_ids': _sorted_ids(_data['Payee_ID'])
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def confusion_counts(fingerprint, start_date, end_date, _data):
+    """(tn, fp, fn, tp) for rows inside the metrics date range, as plain ints."""
+    # Inclusive day range against process_data's int32 day index, as in filter_data
+    days = _data[DAY_COLUMN].to_numpy()
+    in_range = (days >= np.datetime64(start_date, 'D').astype(np.int64)) & \
+               (days <= np.datetime64(end_date, 'D').astype(np.int64))
+
+    # All four cells in one pass over the flags, no filtered frame (a parallel Numba loop when available)
+    return count_confusion(_data['is_fraud_rule'].to_numpy(), _data['is_fraud_predicted'].to_numpy(), in_range)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def cached_filter(fingerprint, date_range, payer_ids, payee_ids, transaction_id, _data):
+    """filter_data for one snapshot and filter set; shared across reruns without copying, so callers must not mutate it."""
+    return filter_data(
+        _data,
+        date_range=date_range,
+        payer_id=list(payer_ids) or None,
+        payee_id=list(payee_ids) or None,
+        transaction_id=transaction_id
+    )
 
-# Try to load real-time data first if available
-if st.session_state.data is None:
-    # Try to update from database first
-    if USE_DATABASE:
-        try:
-            logger.info("Attempting to load data from MySQL database")
-            if update_transactions():
-                logger.info("Successfully updated transactions from MySQL database")
 
-                if os.path.exists(HISTORY_FILE):
-                    data = pd.read_csv(HISTORY_FILE)
-                    if not data.empty:
-                        # Process data to ensure it has required columns
-                        data = process_data(data)
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_csv(fingerprint, date_range, payer_ids, payee_ids, transaction_id, _filtered_data):
+    """CSV bytes for the download button, keyed by the snapshot and the filters that produced the frame."""
+    return _filtered_data.drop(columns=[DAY_COLUMN, TID_LOWER_COLUMN], errors='ignore').to_csv(index=False).encode()
 
-                        # Store in session state
-                        st.session_state.data = data
 
-                        # Display success message
-                        st.success(f"Successfully loaded {len(data)} transactions from MySQL database")
-                else:
-                    st.warning("Database connection successful but no data written to file")
-            else:
-                st.warning("Could not load data from MySQL database")
-        except Exception as e:
-            st.warning(f"Error connecting to MySQL database: {str(e)}")
-            logger.error(f"Database connection error: {e}")
+# Dimensions shown in the Fraud Pattern Analysis tabs, and whether each tab also totals Amount
+GROUP_DIMENSIONS = {
+    'Transaction_Channel': False,
+    'Transaction_Payment_Mode': False,
+    'Payment_Gateway_Bank': False,
+    'Payer_ID': True,
+    'Payee_ID': True
+}
 
-    # If database loading failed or not available, try loading from file
-    if st.session_state.data is None and os.path.exists(HISTORY_FILE):
-        try:
-            data = pd.read_csv(HISTORY_FILE)
-            if not data.empty:
-                # Process data to ensure it has required columns
-                data = process_data(data)
 
-                # Store in session state
-                st.session_state.data = data
+@st.cache_data(show_spinner=False)
+def compute_group_stats(filtered_data):
+    """Aggregate fraud counts and percentages for every tab dimension, cached per filtered frame."""
+    if pl is not None:
+        return _group_stats_polars(filtered_data)
 
-                # Display success message
-                st.success(f"Successfully loaded {len(data)} transactions from saved data file")
-        except Exception as e:
-            st.warning(f"Could not load real-time data: {str(e)}")
-            logger.error(f"File loading error: {e}")
-
-# Real-time data controls section
-st.header("Real-time Data Controls")
-
-# Create two columns for the real-time data controls
-col1, col2, col3 = st.columns([1, 1, 2])
-
-with col1:
-    # Auto-refresh toggle
-    auto_refresh = st.toggle("Auto-refresh", value=st.session_state.auto_refresh)
-    if auto_refresh != st.session_state.auto_refresh:
-        st.session_state.auto_refresh = auto_refresh
-
-with col2:
-    # Refresh interval selector
-    refresh_interval = st.number_input(
-        "Refresh interval (seconds)",
-        min_value=1,
-        max_value=60,
-        value=st.session_state.refresh_interval,
-        step=1
+    group_stats = {}
+    for col, with_amount in GROUP_DIMENSIONS.items():
+        aggregations = dict(
+            total=('Transaction_ID', 'count'),
+            predicted_frauds=('is_fraud_predicted', 'sum'),
+            reported_frauds=('is_fraud_rule', 'sum')
+        )
+        stats = filtered_data.groupby(col, observed=True).agg(**aggregations).reset_index()
+        if with_amount:
+            # Amount is stored as float32; total it in float64 so large sums keep their cents.
+            # Same keys and ordering as the groupby above, so the sums line up row for row
+            amounts = filtered_data['Amount'].astype(np.float64).groupby(filtered_data[col], observed=True).sum()
+            stats['total_amount'] = amounts.to_numpy()
+
+        # Calculate percentages
+        stats['predicted_fraud_pct'] = (stats['predicted_frauds'] / stats['total'] * 100).round(2)
+        stats['reported_fraud_pct'] = (stats['reported_frauds'] / stats['total'] * 100).round(2)
+        group_stats[col] = stats
+    return group_stats
+
+
+def _group_stats_polars(filtered_data):
+    # Same frames as the pandas path: null keys dropped, groups in key order, pandas out for the charts
+    frame = pl.from_pandas(filtered_data[['Transaction_ID', 'is_fraud_predicted', 'is_fraud_rule', 'Amount',
+                                          *GROUP_DIMENSIONS]])
+    group_stats = {}
+    for col, with_amount in GROUP_DIMENSIONS.items():
+        aggregations = [
+            pl.col('Transaction_ID').count().alias('total'),
+            pl.col('is_fraud_predicted').sum().alias('predicted_frauds'),
+            pl.col('is_fraud_rule').sum().alias('reported_frauds')
+        ]
+        if with_amount:
+            # Float32 sums stay Float32 in Polars; widen first so large totals keep their cents
+            aggregations.append(pl.col('Amount').cast(pl.Float64).sum().alias('total_amount'))
+        stats = (
+            frame.drop_nulls(col)
+            .group_by(col)
+            .agg(aggregations)
+            .sort(pl.col(col).cast(pl.String))
+            .with_columns(
+                (pl.col('predicted_frauds') / pl.col('total') * 100).round(2).alias('predicted_fraud_pct'),
+                (pl.col('reported_frauds') / pl.col('total') * 100).round(2).alias('reported_fraud_pct')
+            )
+        )
+        group_stats[col] = stats.to_pandas()
+    return group_stats
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def bar_comparison(stats, x_col, title, x_title):
+    """Grouped predicted vs reported fraud % bars; cached so unchanged tab data skips the rebuild."""
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=stats[x_col],
+        y=stats['predicted_fraud_pct'],
+        name='Predicted Fraud %',
+        marker_color='orange'
+    ))
+
+    fig.add_trace(go.Bar(
+        x=stats[x_col],
+        y=stats['reported_fraud_pct'],
+        name='Reported Fraud %',
+        marker_color='red'
+    ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title='Percentage (%)',
+        barmode='group',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
-    if refresh_interval != st.session_state.refresh_interval:
-        st.session_state.refresh_interval = refresh_interval
-
-with col3:
-    # Manual refresh button and last refresh time
-    col3a, col3b = st.columns(2)
-    with col3a:
-        if st.button("🔄 Refresh Now"):
-            if check_for_new_data():
-                st.rerun()
-            else:
-                st.info("No new data available")
-    with col3b:
-        st.text(f"Last refreshed: {st.session_state.last_refresh_time.strftime('%H:%M:%S')}")
+    return fig
+
+
+def render_overview(filtered_data, metric_slots):
+    """Write the four overview metrics into their pre-declared st.empty() slots."""
+    metric_slots[0].metric("Total Transactions", len(filtered_data))
+
+    predicted_fraud_count = int(filtered_data['is_fraud_predicted'].to_numpy().sum())
+    predicted_fraud_pct = (predicted_fraud_count / len(filtered_data)) * 100 if len(filtered_data) > 0 else 0
+    metric_slots[1].metric("Predicted Frauds", f"{predicted_fraud_count} ({predicted_fraud_pct:.2f}%)")
+
+    reported_fraud_count = int(filtered_data['is_fraud_rule'].to_numpy().sum())
+    reported_fraud_pct = (reported_fraud_count / len(filtered_data)) * 100 if len(filtered_data) > 0 else 0
+    metric_slots[2].metric("Reported Frauds", f"{reported_fraud_count} ({reported_fraud_pct:.2f}%)")
 
-# Auto-refresh logic
-if st.session_state.auto_refresh:
-    # Check if it's time to refresh based on the interval
+    total_amount = filtered_data['Amount'].to_numpy().sum(dtype=np.float64)
+    metric_slots[3].metric("Total Transaction Amount", f"${total_amount:,.2f}")
+
+
+def poll_live_data():
+    """Poll for new data; run as a fragment so an idle tick reruns only this, not every chart and tab."""
     current_time = datetime.now()
-    if (current_time - st.session_state.last_refresh_time).total_seconds() >= st.session_state.refresh_interval:
-        # Update last refresh time
+    if st.session_state.auto_refresh and \
+            (current_time - st.session_state.last_refresh_time).total_seconds() >= st.session_state.refresh_interval:
         st.session_state.last_refresh_time = current_time
-        # Check for new data
         if check_for_new_data():
+            # New data changes every section, so rerun the whole app once
             st.rerun()
 
-# Data Upload Section (alternative to real-time data)
-st.header("Manual Data Upload")
-st.markdown("If you don't have real-time data available, you can manually upload a file:")
-uploaded_file = st.file_uploader("Upload your transaction data (CSV or Excel)", type=["csv", "xlsx"])
 
-if uploaded_file is not None:
-    try:
-        # Load data based on file type
-        if uploaded_file.name.endswith('.csv'):
-            data = pd.read_csv(uploaded_file)
-        else:
-            data = pd.read_excel(uploaded_file)
+def render_dashboard():
+    """Render the full dashboard into the current Streamlit page."""
+    init_session_state()
 
-        # Process data to ensure it has required columns
-        data = process_data(data)
+    # Live panel: polls for new data on its own timer. Built per run because run_every follows the session settings
+    live_panel = st.fragment(
+        run_every=f"{st.session_state.refresh_interval}s" if st.session_state.auto_refresh else None
+    )(poll_live_data)
 
-        # Store in session state
-        st.session_state.data = data
+    # Header
+    st.title("Fraud Analysis Dashboard")
 
-        # Display success message
-        st.success(f"Successfully loaded data with {len(data)} transactions")
+    # Try to load real-time data first if available, falling back to the saved file
+    if st.session_state.data is None:
+        for source in (['db', 'file'] if USE_DATABASE else ['file']):
+            try:
+                data = load_transactions(source, timeout=INITIAL_POLL_TIMEOUT)
+                if data is not None and not data.empty:
+                    # Store in session state
+                    st.session_state.data = data
 
-    except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        st.info(
-            "Make sure your data contains the required columns: Transaction_ID, Timestamp, Payer_ID, Payee_ID, is_fraud_predicted, is_fraud_rule, Transaction_Channel, Transaction_Payment_Mode, Payment_Gateway_Bank, and Amount")
-
-# Main dashboard content
-if st.session_state.data is not None:
-    data = st.session_state.data
-
-    # Get min and max dates for filters
-    min_date = pd.to_datetime(data['Timestamp']).min().date()
-    max_date = pd.to_datetime(data['Timestamp']).max().date()
-
-    # Sidebar for filters
-    st.sidebar.header("Filters")
-
-    # Date range filter
-    date_range = st.sidebar.date_input(
-        "Date Range",
-        value=(min_date, max_date),
-        min_value=min_date,
-        max_value=max_date
-    )
+                    # Display success message
+                    origin = "MySQL database" if source == 'db' else "saved data file"
+                    st.success(f"Successfully loaded {len(data)} transactions from {origin}")
+                    break
+                if source == 'db':
+                    st.warning("Could not load data from MySQL database")
+            except Exception as e:
+                st.warning(f"Could not load real-time data: {str(e)}")
+                logger.error(f"Error loading data from {source}: {e}")
 
-    if len(date_range) == 2:
-        st.session_state.date_range = date_range
+    # Real-time data controls section
+    st.header("Real-time Data Controls")
 
-    # Payer ID filter
-    payer_ids = sorted(data['Payer_ID'].astype(str).unique().tolist())
-
-    selected_payer = st.sidebar.multiselect(
-        "Filter by Payer ID",
-        options=payer_ids,
-        default=None
-    )
-    st.session_state.payer_id = selected_payer if selected_payer else None
-
-    # Payee ID filter
-    payee_ids = sorted(data['Payee_ID'].astype(str).unique().tolist())
-    selected_payee = st.sidebar.multiselect(
-        "Filter by Payee ID",
-        options=payee_ids,
-        default=None
-    )
-    st.session_state.payee_id = selected_payee if selected_payee else None
-
-    # Transaction ID search
-    transaction_id = st.sidebar.text_input("Search by Transaction ID", value=st.session_state.transaction_id)
-    st.session_state.transaction_id = transaction_id
-
-    # Apply filters
-    filtered_data = filter_data(
-        data,
-        date_range=st.session_state.date_range,
-        payer_id=st.session_state.payer_id,
-        payee_id=st.session_state.payee_id,
-        transaction_id=st.session_state.transaction_id
-    )
-
-    # Stats overview
-    st.header("Overview Statistics")
-
-    # Create three columns for key metrics
-    col1, col2, col3, col4 = st.columns(4)
+    # Create two columns for the real-time data controls
+    col1, col2, col3 = st.columns([1, 1, 2])
 
     with col1:
-        st.metric("Total Transactions", len(filtered_data))
+        # Auto-refresh toggle
+        auto_refresh = st.toggle("Auto-refresh", value=st.session_state.auto_refresh)
+        if auto_refresh != st.session_state.auto_refresh:
+            st.session_state.auto_refresh = auto_refresh
 
     with col2:
-        predicted_fraud_count = filtered_data['is_fraud_predicted'].sum()
-        predicted_fraud_pct = (predicted_fraud_count / len(filtered_data)) * 100 if len(filtered_data) > 0 else 0
-        st.metric("Predicted Frauds", f"{predicted_fraud_count} ({predicted_fraud_pct:.2f}%)")
+        # Refresh interval selector
+        refresh_interval = st.number_input(
+            "Refresh interval (seconds)",
+            min_value=1,
+            max_value=60,
+            value=st.session_state.refresh_interval,
+            step=1
+        )
+        if refresh_interval != st.session_state.refresh_interval:
+            st.session_state.refresh_interval = refresh_interval
 
     with col3:
-        reported_fraud_count = filtered_data['is_fraud_rule'].sum()
-        reported_fraud_pct = (reported_fraud_count / len(filtered_data)) * 100 if len(filtered_data) > 0 else 0
-        st.metric("Reported Frauds", f"{reported_fraud_count} ({reported_fraud_pct:.2f}%)")
-
-    with col4:
-        total_amount = filtered_data['Amount'].sum()
-        st.metric("Total Transaction Amount", f"${total_amount:,.2f}")
-
-    # Transaction data table
-    st.header("Transaction Data")
-
-    # Format data for display
-    display_data = filtered_data.copy()
-    display_data['Timestamp'] = pd.to_datetime(display_data['Timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
-    display_data['Amount'] = display_data['Amount'].apply(lambda x: f"${x:,.2f}")
-    display_data['is_fraud_predicted'] = display_data['is_fraud_predicted'].apply(lambda x: '✅' if x else '❌')
-    display_data['is_fraud_rule'] = display_data['is_fraud_rule'].apply(lambda x: '✅' if x else '❌')
-
-    # Display table with pagination
-    st.dataframe(display_data, use_container_width=True)
-
-    # Time Series Analysis
-    st.header("Time Series Analysis")
-
-    # Time frame selector
-    time_frame = st.selectbox(
-        "Select Time Frame",
-        options=["Last 7 days", "Last 30 days", "Last 90 days", "Last year", "All time"],
-        index=4  # Default to "All time"
-    )
+        # Manual refresh button and last refresh time
+        col3a, col3b = st.columns(2)
+        with col3a:
+            if st.button("🔄 Refresh Now"):
+                if check_for_new_data():
+                    st.rerun()
+                else:
+                    st.info("No new data available")
+        with col3b:
+            st.text(f"Last refreshed: {st.session_state.last_refresh_time.strftime('%H:%M:%S')}")
 
-    # Calculate time series data based on selection
-    if time_frame != "All time":
-        if time_frame == "Last 7 days":
-            cutoff_date = max_date - timedelta(days=7)
-        elif time_frame == "Last 30 days":
-            cutoff_date = max_date - timedelta(days=30)
-        elif time_frame == "Last 90 days":
-            cutoff_date = max_date - timedelta(days=90)
-        else:  # Last year
-            cutoff_date = max_date - timedelta(days=365)
-
-        time_series_data = filtered_data[pd.to_datetime(filtered_data['Timestamp']).dt.date >= cutoff_date]
-    else:
-        time_series_data = filtered_data
-
-    if len(time_series_data) > 0:
-        # Determine time granularity based on time frame
-        granularity = get_time_granularity(time_frame)
-
-        # Group by time and count frauds
-        time_series_data['Timestamp'] = pd.to_datetime(time_series_data['Timestamp'])
-
-        if granularity == 'D':
-            time_series_data['TimeBucket'] = time_series_data['Timestamp'].dt.date
-            x_title = "Date"
-        elif granularity == 'W':
-            time_series_data['TimeBucket'] = time_series_data['Timestamp'].dt.to_period('W').apply(
-                lambda x: x.start_time.date())
-            x_title = "Week Starting"
-        elif granularity == 'M':
-            time_series_data['TimeBucket'] = time_series_data['Timestamp'].dt.to_period('M').apply(
-                lambda x: x.start_time.date())
-            x_title = "Month"
-        else:  # 'H' - hourly
-            time_series_data['TimeBucket'] = time_series_data['Timestamp'].dt.floor('H')
-            x_title = "Hour"
-
-        # Aggregate by time bucket
-        time_agg = time_series_data.groupby('TimeBucket').agg(
-            total_transactions=('Transaction_ID', 'count'),
-            predicted_frauds=('is_fraud_predicted', 'sum'),
-            reported_frauds=('is_fraud_rule', 'sum')
-        ).reset_index()
-
-        # Create time series plot
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=time_agg['TimeBucket'],
-            y=time_agg['total_transactions'],
-            mode='lines',
-            name='Total Transactions',
-            line=dict(color='blue', width=2)
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=time_agg['TimeBucket'],
-            y=time_agg['predicted_frauds'],
-            mode='lines',
-            name='Predicted Frauds',
-            line=dict(color='orange', width=2)
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=time_agg['TimeBucket'],
-            y=time_agg['reported_frauds'],
-            mode='lines',
-            name='Reported Frauds',
-            line=dict(color='red', width=2)
-        ))
-
-        fig.update_layout(
-            title='Transaction and Fraud Trends Over Time',
-            xaxis_title=x_title,
-            yaxis_title='Count',
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            hovermode="x unified"
+    # Data Upload Section (alternative to real-time data)
+    st.header("Manual Data Upload")
+    st.markdown("If you don't have real-time data available, you can manually upload a file:")
+    uploaded_file = st.file_uploader("Upload your transaction data (CSV or Excel)", type=["csv", "xlsx"])
+
+    if uploaded_file is not None:
+        try:
+            # Load data based on file type
+            if uploaded_file.name.endswith('.csv'):
+                data = pd.read_csv(uploaded_file)
+            else:
+                data = pd.read_excel(uploaded_file)
+
+            # Process data to ensure it has required columns
+            data = process_data(data, copy=False)
+
+            # Store in session state
+            st.session_state.data = data
+
+            # Display success message
+            st.success(f"Successfully loaded data with {len(data)} transactions")
+
+        except Exception as e:
+            st.error(f"Error loading data: {str(e)}")
+            st.info(
+                "Make sure your data contains the required columns: Transaction_ID, Timestamp, Payer_ID, Payee_ID, is_fraud_predicted, is_fraud_rule, Transaction_Channel, Transaction_Payment_Mode, Payment_Gateway_Bank, and Amount")
+
+    # Main dashboard content
+    if st.session_state.data is not None:
+        data = st.session_state.data
+
+        # Get min and max dates and the ID lists for filters (recomputed only for a new data snapshot)
+        options = filter_options(data_fingerprint(data), data)
+        min_date = options['min_date']
+        max_date = options['max_date']
+
+        # Sidebar for filters
+        st.sidebar.header("Filters")
+
+        # Date range filter
+        date_range = st.sidebar.date_input(
+            "Date Range",
+            value=(min_date, max_date),
+            min_value=min_date,
+            max_value=max_date
         )
 
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("No data available for the selected time frame.")
-
-    # Fraud Comparison Graphs
-    st.header("Fraud Pattern Analysis")
-
-    # Create tabs for different comparisons
-    tabs = st.tabs([
-        "Transaction Channel",
-        "Payment Mode",
-        "Gateway Bank",
-        "Payer Analysis",
-        "Payee Analysis"
-    ])
-
-    # Tab 1: Transaction Channel Analysis
-    with tabs[0]:
-        if len(filtered_data) > 0:
-            # Group by Transaction Channel
-            channel_data = filtered_data.groupby('Transaction_Channel').agg(
-                total=('Transaction_ID', 'count'),
+        if len(date_range) == 2:
+            st.session_state.date_range = date_range
+
+        # Payer ID filter
+        payer_ids = options['payer_ids']
+
+        selected_payer = st.sidebar.multiselect(
+            "Filter by Payer ID",
+            options=payer_ids,
+            default=None
+        )
+        st.session_state.payer_id = selected_payer if selected_payer else None
+
+        # Payee ID filter
+        payee_ids = options['payee_ids']
+        selected_payee = st.sidebar.multiselect(
+            "Filter by Payee ID",
+            options=payee_ids,
+            default=None
+        )
+        st.session_state.payee_id = selected_payee if selected_payee else None
+
+        # Transaction ID search
+        transaction_id = st.sidebar.text_input("Search by Transaction ID", value=st.session_state.transaction_id)
+        st.session_state.transaction_id = transaction_id
+
+        # Apply filters (reruns with unchanged filters reuse the previous result)
+        filtered_data = cached_filter(
+            data_fingerprint(data),
+            st.session_state.date_range,
+            tuple(st.session_state.payer_id or ()),
+            tuple(st.session_state.payee_id or ()),
+            st.session_state.transaction_id,
+            data
+        )
+
+        # Stats overview: one slot per metric, filled in place
+        st.header("Overview Statistics")
+        metric_slots = [col.empty() for col in st.columns(4)]
+        render_overview(filtered_data, metric_slots)
+
+        # Poll for new data between full reruns
+        live_panel()
+
+        # Every section below works on filtered_data, so stop once here when the filters match nothing
+        if filtered_data.empty:
+            st.warning("No data available for the selected filters.")
+            return
+
+        # Transaction data table
+        st.header("Transaction Data")
+
+        # Display table with pagination; the browser formats only the rows it shows
+        st.dataframe(
+            # CheckboxColumn needs bool; the flags are stored as int8
+            filtered_data.assign(
+                is_fraud_predicted=filtered_data['is_fraud_predicted'].astype(bool),
+                is_fraud_rule=filtered_data['is_fraud_rule'].astype(bool)
+            ),
+            use_container_width=True,
+            column_config={
+                'Timestamp': st.column_config.DatetimeColumn(format='YYYY-MM-DD HH:mm:ss'),
+                'Amount': st.column_config.NumberColumn(format='$%.2f'),
+                'is_fraud_predicted': st.column_config.CheckboxColumn(),
+                'is_fraud_rule': st.column_config.CheckboxColumn(),
+                # Internal filter columns, not for display
+                DAY_COLUMN: None,
+                TID_LOWER_COLUMN: None
+            }
+        )
+
+        # Time Series Analysis
+        st.header("Time Series Analysis")
+
+        # Time frame selector
+        time_frame = st.selectbox(
+            "Select Time Frame",
+            options=["Last 7 days", "Last 30 days", "Last 90 days", "Last year", "All time"],
+            index=4  # Default to "All time"
+        )
+
+        # Calculate time series data based on selection
+        if time_frame != "All time":
+            if time_frame == "Last 7 days":
+                cutoff_date = max_date - timedelta(days=7)
+            elif time_frame == "Last 30 days":
+                cutoff_date = max_date - timedelta(days=30)
+            elif time_frame == "Last 90 days":
+                cutoff_date = max_date - timedelta(days=90)
+            else:  # Last year
+                cutoff_date = max_date - timedelta(days=365)
+
+            # Compare the raw datetime64 values instead of materializing Python dates
+            time_series_data = filtered_data[filtered_data['Timestamp'].to_numpy() >= np.datetime64(cutoff_date)]
+        else:
+            time_series_data = filtered_data
+
+        if len(time_series_data) > 0:
+            # Determine time granularity based on time frame
+            granularity = get_time_granularity(time_frame)
+
+            # Group by time and count frauds
+            if granularity == 'D':
+                time_bucket = time_series_data['Timestamp'].dt.date.rename('TimeBucket')
+                x_title = "Date"
+            elif granularity == 'W':
+                time_bucket = time_series_data['Timestamp'].dt.to_period('W').dt.start_time.dt.date.rename('TimeBucket')
+                x_title = "Week Starting"
+            elif granularity == 'M':
+                time_bucket = time_series_data['Timestamp'].dt.to_period('M').dt.start_time.dt.date.rename('TimeBucket')
+                x_title = "Month"
+            else:  # 'H' - hourly
+                time_bucket = time_series_data['Timestamp'].dt.floor('h').rename('TimeBucket')
+                x_title = "Hour"
+
+            # Aggregate by time bucket
+            time_agg = time_series_data.groupby(time_bucket).agg(
+                total_transactions=('Transaction_ID', 'count'),
                 predicted_frauds=('is_fraud_predicted', 'sum'),
                 reported_frauds=('is_fraud_rule', 'sum')
             ).reset_index()
 
-            # Calculate percentages
-            channel_data['predicted_fraud_pct'] = (
-                        channel_data['predicted_frauds'] / channel_data['total'] * 100).round(2)
-            channel_data['reported_fraud_pct'] = (channel_data['reported_frauds'] / channel_data['total'] * 100).round(
-                2)
-
-            # Create comparison bar chart
+            # Create time series plot
             fig = go.Figure()
 
-            fig.add_trace(go.Bar(
-                x=channel_data['Transaction_Channel'],
-                y=channel_data['predicted_fraud_pct'],
-                name='Predicted Fraud %',
-                marker_color='orange'
+            fig.add_trace(go.Scatter(
+                x=time_agg['TimeBucket'],
+                y=time_agg['total_transactions'],
+                mode='lines',
+                name='Total Transactions',
+                line=dict(color='blue', width=2)
             ))
 
-            fig.add_trace(go.Bar(
-                x=channel_data['Transaction_Channel'],
-                y=channel_data['reported_fraud_pct'],
-                name='Reported Fraud %',
-                marker_color='red'
+            fig.add_trace(go.Scatter(
+                x=time_agg['TimeBucket'],
+                y=time_agg['predicted_frauds'],
+                mode='lines',
+                name='Predicted Frauds',
+                line=dict(color='orange', width=2)
+            ))
+
+            fig.add_trace(go.Scatter(
+                x=time_agg['TimeBucket'],
+                y=time_agg['reported_frauds'],
+                mode='lines',
+                name='Reported Frauds',
+                line=dict(color='red', width=2)
             ))
 
             fig.update_layout(
-                title='Fraud Percentage by Transaction Channel',
-                xaxis_title='Transaction Channel',
-                yaxis_title='Percentage (%)',
-                barmode='group',
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                title='Transaction and Fraud Trends Over Time',
+                xaxis_title=x_title,
+                yaxis_title='Count',
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                hovermode="x unified"
             )
 
             st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning("No data available for the selected time frame.")
+
+        # Fraud Comparison Graphs
+        st.header("Fraud Pattern Analysis")
+
+        group_stats = compute_group_stats(filtered_data)
+
+        # Create tabs for different comparisons
+        tabs = st.tabs([
+            "Transaction Channel",
+            "Payment Mode",
+            "Gateway Bank",
+            "Payer Analysis",
+            "Payee Analysis"
+        ])
+
+        # Tab 1: Transaction Channel Analysis
+        with tabs[0]:
+            channel_data = group_stats['Transaction_Channel']
+
+            # Create comparison bar chart
+            fig = bar_comparison(channel_data, 'Transaction_Channel', 'Fraud Percentage by Transaction Channel', 'Transaction Channel')
+            st.plotly_chart(fig, use_container_width=True)
 
             # Display data table
             st.subheader("Transaction Channel Data")
             channel_display = channel_data.copy()
-            channel_display['predicted_fraud_pct'] = channel_display['predicted_fraud_pct'].apply(lambda x: f"{x:.2f}%")
-            channel_display['reported_fraud_pct'] = channel_display['reported_fraud_pct'].apply(lambda x: f"{x:.2f}%")
+            channel_display['predicted_fraud_pct'] = channel_display['predicted_fraud_pct'].map('{:.2f}%'.format)
+            channel_display['reported_fraud_pct'] = channel_display['reported_fraud_pct'].map('{:.2f}%'.format)
             st.dataframe(channel_display, use_container_width=True)
-        else:
-            st.warning("No data available for analysis.")
-
-    # Tab 2: Payment Mode Analysis
-    with tabs[1]:
-        if len(filtered_data) > 0:
-            # Group by Payment Mode
-            payment_mode_data = filtered_data.groupby('Transaction_Payment_Mode').agg(
-                total=('Transaction_ID', 'count'),
-                predicted_frauds=('is_fraud_predicted', 'sum'),
-                reported_frauds=('is_fraud_rule', 'sum')
-            ).reset_index()
 
-            # Calculate percentages
-            payment_mode_data['predicted_fraud_pct'] = (
-                        payment_mode_data['predicted_frauds'] / payment_mode_data['total'] * 100).round(2)
-            payment_mode_data['reported_fraud_pct'] = (
-                        payment_mode_data['reported_frauds'] / payment_mode_data['total'] * 100).round(2)
+        # Tab 2: Payment Mode Analysis
+        with tabs[1]:
+            payment_mode_data = group_stats['Transaction_Payment_Mode']
 
             # Create comparison bar chart
-            fig = go.Figure()
-
-            fig.add_trace(go.Bar(
-                x=payment_mode_data['Transaction_Payment_Mode'],
-                y=payment_mode_data['predicted_fraud_pct'],
-                name='Predicted Fraud %',
-                marker_color='orange'
-            ))
-
-            fig.add_trace(go.Bar(
-                x=payment_mode_data['Transaction_Payment_Mode'],
-                y=payment_mode_data['reported_fraud_pct'],
-                name='Reported Fraud %',
-                marker_color='red'
-            ))
-
-            fig.update_layout(
-                title='Fraud Percentage by Payment Mode',
-                xaxis_title='Payment Mode',
-                yaxis_title='Percentage (%)',
-                barmode='group',
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-
+            fig = bar_comparison(payment_mode_data, 'Transaction_Payment_Mode', 'Fraud Percentage by Payment Mode', 'Payment Mode')
             st.plotly_chart(fig, use_container_width=True)
 
             # Display data table
             st.subheader("Payment Mode Data")
             payment_display = payment_mode_data.copy()
-            payment_display['predicted_fraud_pct'] = payment_display['predicted_fraud_pct'].apply(lambda x: f"{x:.2f}%")
-            payment_display['reported_fraud_pct'] = payment_display['reported_fraud_pct'].apply(lambda x: f"{x:.2f}%")
+            payment_display['predicted_fraud_pct'] = payment_display['predicted_fraud_pct'].map('{:.2f}%'.format)
+            payment_display['reported_fraud_pct'] = payment_display['reported_fraud_pct'].map('{:.2f}%'.format)
             st.dataframe(payment_display, use_container_width=True)
-        else:
-            st.warning("No data available for analysis.")
-
-    # Tab 3: Gateway Bank Analysis
-    with tabs[2]:
-        if len(filtered_data) > 0:
-            # Group by Gateway Bank
-            bank_data = filtered_data.groupby('Payment_Gateway_Bank').agg(
-                total=('Transaction_ID', 'count'),
-                predicted_frauds=('is_fraud_predicted', 'sum'),
-                reported_frauds=('is_fraud_rule', 'sum')
-            ).reset_index()
 
-            # Calculate percentages
-            bank_data['predicted_fraud_pct'] = (bank_data['predicted_frauds'] / bank_data['total'] * 100).round(2)
-            bank_data['reported_fraud_pct'] = (bank_data['reported_frauds'] / bank_data['total'] * 100).round(2)
+        # Tab 3: Gateway Bank Analysis
+        with tabs[2]:
+            bank_data = group_stats['Payment_Gateway_Bank']
 
             # Create comparison bar chart
-            fig = go.Figure()
-
-            fig.add_trace(go.Bar(
-                x=bank_data['Payment_Gateway_Bank'],
-                y=bank_data['predicted_fraud_pct'],
-                name='Predicted Fraud %',
-                marker_color='orange'
-            ))
-
-            fig.add_trace(go.Bar(
-                x=bank_data['Payment_Gateway_Bank'],
-                y=bank_data['reported_fraud_pct'],
-                name='Reported Fraud %',
-                marker_color='red'
-            ))
-
-            fig.update_layout(
-                title='Fraud Percentage by Payment Gateway Bank',
-                xaxis_title='Gateway Bank',
-                yaxis_title='Percentage (%)',
-                barmode='group',
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-
+            fig = bar_comparison(bank_data, 'Payment_Gateway_Bank', 'Fraud Percentage by Payment Gateway Bank', 'Gateway Bank')
             st.plotly_chart(fig, use_container_width=True)
 
             # Display data table
             st.subheader("Gateway Bank Data")
             bank_display = bank_data.copy()
-            bank_display['predicted_fraud_pct'] = bank_display['predicted_fraud_pct'].apply(lambda x: f"{x:.2f}%")
-            bank_display['reported_fraud_pct'] = bank_display['reported_fraud_pct'].apply(lambda x: f"{x:.2f}%")
+            bank_display['predicted_fraud_pct'] = bank_display['predicted_fraud_pct'].map('{:.2f}%'.format)
+            bank_display['reported_fraud_pct'] = bank_display['reported_fraud_pct'].map('{:.2f}%'.format)
             st.dataframe(bank_display, use_container_width=True)
-        else:
-            st.warning("No data available for analysis.")
-
-    # Tab 4: Payer Analysis
-    with tabs[3]:
-        if len(filtered_data) > 0:
-            # Group by Payer ID
-            payer_data = filtered_data.groupby('Payer_ID').agg(
-                total=('Transaction_ID', 'count'),
-                predicted_frauds=('is_fraud_predicted', 'sum'),
-                reported_frauds=('is_fraud_rule', 'sum'),
-                total_amount=('Amount', 'sum')
-            ).reset_index()
 
-            # Calculate percentages
-            payer_data['predicted_fraud_pct'] = (payer_data['predicted_frauds'] / payer_data['total'] * 100).round(2)
-            payer_data['reported_fraud_pct'] = (payer_data['reported_frauds'] / payer_data['total'] * 100).round(2)
+        # Tab 4: Payer Analysis
+        with tabs[3]:
+            payer_data = group_stats['Payer_ID']
 
-            # Sort by total transactions
-            payer_data = payer_data.sort_values('total', ascending=False).head(10)
+            # Top 10 by total transactions (partial selection, no full sort)
+            payer_data = payer_data.nlargest(10, 'total')
 
             # Create comparison bar chart
-            fig = go.Figure()
-
-            fig.add_trace(go.Bar(
-                x=payer_data['Payer_ID'],
-                y=payer_data['predicted_fraud_pct'],
-                name='Predicted Fraud %',
-                marker_color='orange'
-            ))
-
-            fig.add_trace(go.Bar(
-                x=payer_data['Payer_ID'],
-                y=payer_data['reported_fraud_pct'],
-                name='Reported Fraud %',
-                marker_color='red'
-            ))
-
-            fig.update_layout(
-                title='Fraud Percentage by Top 10 Payers (by transaction count)',
-                xaxis_title='Payer ID',
-                yaxis_title='Percentage (%)',
-                barmode='group',
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-
+            fig = bar_comparison(payer_data, 'Payer_ID', 'Fraud Percentage by Top 10 Payers (by transaction count)', 'Payer ID')
             st.plotly_chart(fig, use_container_width=True)
 
             # Display data table
             st.subheader("Top Payer Data")
             payer_display = payer_data.copy()
-            payer_display['predicted_fraud_pct'] = payer_display['predicted_fraud_pct'].apply(lambda x: f"{x:.2f}%")
-            payer_display['reported_fraud_pct'] = payer_display['reported_fraud_pct'].apply(lambda x: f"{x:.2f}%")
-            payer_display['total_amount'] = payer_display['total_amount'].apply(lambda x: f"${x:,.2f}")
+            payer_display['predicted_fraud_pct'] = payer_display['predicted_fraud_pct'].map('{:.2f}%'.format)
+            payer_display['reported_fraud_pct'] = payer_display['reported_fraud_pct'].map('{:.2f}%'.format)
+            payer_display['total_amount'] = payer_display['total_amount'].map('${:,.2f}'.format)
             st.dataframe(payer_display, use_container_width=True)
-        else:
-            st.warning("No data available for analysis.")
-
-    # Tab 5: Payee Analysis
-    with tabs[4]:
-        if len(filtered_data) > 0:
-            # Group by Payee ID
-            payee_data = filtered_data.groupby('Payee_ID').agg(
-                total=('Transaction_ID', 'count'),
-                predicted_frauds=('is_fraud_predicted', 'sum'),
-                reported_frauds=('is_fraud_rule', 'sum'),
-                total_amount=('Amount', 'sum')
-            ).reset_index()
 
-            # Calculate percentages
-            payee_data['predicted_fraud_pct'] = (payee_data['predicted_frauds'] / payee_data['total'] * 100).round(2)
-            payee_data['reported_fraud_pct'] = (payee_data['reported_frauds'] / payee_data['total'] * 100).round(2)
+        # Tab 5: Payee Analysis
+        with tabs[4]:
+            payee_data = group_stats['Payee_ID']
 
-            # Sort by total transactions
-            payee_data = payee_data.sort_values('total', ascending=False).head(10)
+            # Top 10 by total transactions (partial selection, no full sort)
+            payee_data = payee_data.nlargest(10, 'total')
 
             # Create comparison bar chart
-            fig = go.Figure()
-
-            fig.add_trace(go.Bar(
-                x=payee_data['Payee_ID'],
-                y=payee_data['predicted_fraud_pct'],
-                name='Predicted Fraud %',
-                marker_color='orange'
-            ))
-
-            fig.add_trace(go.Bar(
-                x=payee_data['Payee_ID'],
-                y=payee_data['reported_fraud_pct'],
-                name='Reported Fraud %',
-                marker_color='red'
-            ))
-
-            fig.update_layout(
-                title='Fraud Percentage by Top 10 Payees (by transaction count)',
-                xaxis_title='Payee ID',
-                yaxis_title='Percentage (%)',
-                barmode='group',
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-
+            fig = bar_comparison(payee_data, 'Payee_ID', 'Fraud Percentage by Top 10 Payees (by transaction count)', 'Payee ID')
             st.plotly_chart(fig, use_container_width=True)
 
             # Display data table
             st.subheader("Top Payee Data")
             payee_display = payee_data.copy()
-            payee_display['predicted_fraud_pct'] = payee_display['predicted_fraud_pct'].apply(lambda x: f"{x:.2f}%")
-            payee_display['reported_fraud_pct'] = payee_display['reported_fraud_pct'].apply(lambda x: f"{x:.2f}%")
-            payee_display['total_amount'] = payee_display['total_amount'].apply(lambda x: f"${x:,.2f}")
+            payee_display['predicted_fraud_pct'] = payee_display['predicted_fraud_pct'].map('{:.2f}%'.format)
+            payee_display['reported_fraud_pct'] = payee_display['reported_fraud_pct'].map('{:.2f}%'.format)
+            payee_display['total_amount'] = payee_display['total_amount'].map('${:,.2f}'.format)
             st.dataframe(payee_display, use_container_width=True)
-        else:
-            st.warning("No data available for analysis.")
-
-    # Evaluation Metrics Section
-    st.header("Fraud Detection Evaluation Metrics")
-
-    # Metrics date range filter
-    st.subheader("Select Time Period for Metrics")
-    metrics_date_range = st.date_input(
-        "Metrics Date Range",
-        value=(min_date, max_date),
-        min_value=min_date,
-        max_value=max_date,
-        key="metrics_date_range_selector"
-    )
-
-    if len(metrics_date_range) == 2:
-        st.session_state.metrics_date_range = metrics_date_range
-
-        # Filter data for metrics
-        metrics_data = data.copy()
-        if st.session_state.metrics_date_range is not None:
-            start_date, end_date = st.session_state.metrics_date_range
-            metrics_data = metrics_data[
-                (pd.to_datetime(metrics_data['Timestamp']).dt.date >= start_date) &
-                (pd.to_datetime(metrics_data['Timestamp']).dt.date <= end_date)
-                ]
-
-        if len(metrics_data) > 0:
-            # Calculate metrics
-            y_true = metrics_data['is_fraud_rule'].astype(int)
-            y_pred = metrics_data['is_fraud_predicted'].astype(int)
-
-            # Confusion matrix
-            cm = confusion_matrix(y_true, y_pred)
-            tn, fp, fn, tp = cm.ravel()
-
-            # Create confusion matrix figure
-            cm_fig = px.imshow(
-                cm,
-                labels=dict(x="Predicted", y="Actual", color="Count"),
-                x=['Not Fraud', 'Fraud'],
-                y=['Not Fraud', 'Fraud'],
-                text_auto=True,
-                color_continuous_scale='Reds'
-            )
-
-            cm_fig.update_layout(
-                title='Confusion Matrix',
-                xaxis_title='Predicted Label',
-                yaxis_title='Actual Label'
-            )
 
-            # Calculate performance metrics
-            precision = precision_score(y_true, y_pred, zero_division=0)
-            recall = recall_score(y_true, y_pred, zero_division=0)
-            f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-            accuracy = (tp + tn) / (tp + tn + fp + fn)
-
-            # Display metrics in two columns
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.plotly_chart(cm_fig, use_container_width=True)
-
-            with col2:
-                st.subheader("Performance Metrics")
-                metrics_df = pd.DataFrame({
-                    'Metric': ['Accuracy', 'Precision', 'Recall', 'F1 Score'],
-                    'Value': [accuracy, precision, recall, f1],
-                    'Description': [
-                        'Overall correct predictions',
-                        'Percentage of predicted frauds that were actual frauds',
-                        'Percentage of actual frauds that were correctly predicted',
-                        'Harmonic mean of precision and recall'
-                    ]
-                })
-
-                # Format metrics as percentages
-                metrics_df['Value'] = metrics_df['Value'].apply(lambda x: f"{x * 100:.2f}%")
-
-                st.dataframe(metrics_df, use_container_width=True, hide_index=True)
-
-                # Detailed counts
-                st.subheader("Detailed Counts")
-                counts_df = pd.DataFrame({
-                    'Metric': ['True Positives (TP)', 'False Positives (FP)', 'True Negatives (TN)',
-                               'False Negatives (FN)'],
-                    'Count': [tp, fp, tn, fn],
-                    'Description': [
-                        'Correctly predicted frauds',
-                        'Incorrectly predicted as fraud',
-                        'Correctly predicted as not fraud',
-                        'Missed actual frauds'
-                    ]
-                })
-
-                st.dataframe(counts_df, use_container_width=True, hide_index=True)
-        else:
-            st.warning("No data available for the selected time period.")
+        # Evaluation Metrics Section
+        st.header("Fraud Detection Evaluation Metrics")
+
+        # Metrics date range filter
+        st.subheader("Select Time Period for Metrics")
+        metrics_date_range = st.date_input(
+            "Metrics Date Range",
+            value=(min_date, max_date),
+            min_value=min_date,
+            max_value=max_date,
+            key="metrics_date_range_selector"
+        )
 
-    # Download section
-    st.header("Export Data")
+        if len(metrics_date_range) == 2:
+            st.session_state.metrics_date_range = metrics_date_range
 
-    if len(filtered_data) > 0:
-        # Create a download button for the filtered data
-        csv = filtered_data.to_csv(index=False)
+            # Counts only change with the data snapshot or the metrics period
+            start_date, end_date = st.session_state.metrics_date_range
+            tn, fp, fn, tp = confusion_counts(data_fingerprint(data), start_date, end_date, data)
+
+            if tn + fp + fn + tp > 0:
+                cm = np.array([[tn, fp], [fn, tp]])
+
+                # Create confusion matrix figure
+                cm_fig = px.imshow(
+                    cm,
+                    labels=dict(x="Predicted", y="Actual", color="Count"),
+                    x=['Not Fraud', 'Fraud'],
+                    y=['Not Fraud', 'Fraud'],
+                    text_auto=True,
+                    color_continuous_scale='Reds'
+                )
+
+                cm_fig.update_layout(
+                    title='Confusion Matrix',
+                    xaxis_title='Predicted Label',
+                    yaxis_title='Actual Label'
+                )
+
+                # Calculate performance metrics
+                precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+                recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+                f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+                accuracy = (tp + tn) / (tp + tn + fp + fn)
+
+                # Display metrics in two columns
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.plotly_chart(cm_fig, use_container_width=True)
+
+                with col2:
+                    st.subheader("Performance Metrics")
+                    metrics_df = pd.DataFrame({
+                        'Metric': ['Accuracy', 'Precision', 'Recall', 'F1 Score'],
+                        'Value': [accuracy, precision, recall, f1],
+                        'Description': [
+                            'Overall correct predictions',
+                            'Percentage of predicted frauds that were actual frauds',
+                            'Percentage of actual frauds that were correctly predicted',
+                            'Harmonic mean of precision and recall'
+                        ]
+                    })
+
+                    # Format metrics as percentages
+                    metrics_df['Value'] = (metrics_df['Value'] * 100).map('{:.2f}%'.format)
+
+                    st.dataframe(metrics_df, use_container_width=True, hide_index=True)
+
+                    # Detailed counts
+                    st.subheader("Detailed Counts")
+                    counts_df = pd.DataFrame({
+                        'Metric': ['True Positives (TP)', 'False Positives (FP)', 'True Negatives (TN)',
+                                   'False Negatives (FN)'],
+                        'Count': [tp, fp, tn, fn],
+                        'Description': [
+                            'Correctly predicted frauds',
+                            'Incorrectly predicted as fraud',
+                            'Correctly predicted as not fraud',
+                            'Missed actual frauds'
+                        ]
+                    })
+
+                    st.dataframe(counts_df, use_container_width=True, hide_index=True)
+            else:
+                st.warning("No data available for the selected time period.")
+
+        # Download section
+        st.header("Export Data")
+
+        # Create a download button for the filtered data; serialized once per data snapshot and filter set
+        csv = export_csv(
+            data_fingerprint(data),
+            st.session_state.date_range,
+            tuple(st.session_state.payer_id or ()),
+            tuple(st.session_state.payee_id or ()),
+            st.session_state.transaction_id,
+            filtered_data
+        )
 
         st.download_button(
             label="Download Filtered Data as CSV",
@@ -809,25 +872,37 @@ if st.session_state.data is not None:
             file_name="fraud_analysis_data.csv",
             mime="text/csv"
         )
-else:
-    # Show welcome message and instructions when no data is loaded
-    st.info("Welcome to the Fraud Analysis Dashboard. Please upload your transaction data to begin.")
-
-    st.markdown("""
-    ### Required Data Format
-
-    Your data should include the following columns:
-    - Transaction_ID: Unique identifier for each transaction
-    - Timestamp: Date and time of the transaction
-    - Payer_ID: ID of the entity making the payment
-    - Payee_ID: ID of the entity receiving the payment
-    - is_fraud_predicted: Boolean indicating if the system flagged the transaction as fraud (0 or 1)
-    - is_fraud_rule: Boolean indicating if the transaction was actually reported as fraud (0 or 1)
-    - Transaction_Channel: Channel used for the transaction (e.g., Mobile, Web, POS)
-    - Transaction_Payment_Mode: Payment method (e.g., Credit Card, Debit Card, UPI)
-    - Payment_Gateway_Bank: Bank processing the payment
-    - Amount: Transaction amount
-
-    Upload a CSV or Excel file with these columns to analyze your fraud detection performance.
-    """)
-
+    else:
+        # Keep polling so data that arrives later is picked up
+        live_panel()
+
+        # Show welcome message and instructions when no data is loaded
+        st.info("Welcome to the Fraud Analysis Dashboard. Please upload your transaction data to begin.")
+
+        st.markdown("""
+        ### Required Data Format
+
+        Your data should include the following columns:
+        - Transaction_ID: Unique identifier for each transaction
+        - Timestamp: Date and time of the transaction
+        - Payer_ID: ID of the entity making the payment
+        - Payee_ID: ID of the entity receiving the payment
+        - is_fraud_predicted: Boolean indicating if the system flagged the transaction as fraud (0 or 1)
+        - is_fraud_rule: Boolean indicating if the transaction was actually reported as fraud (0 or 1)
+        - Transaction_Channel: Channel used for the transaction (e.g., Mobile, Web, POS)
+        - Transaction_Payment_Mode: Payment method (e.g., Credit Card, Debit Card, UPI)
+        - Payment_Gateway_Bank: Bank processing the payment
+        - Amount: Transaction amount
+
+        Upload a CSV or Excel file with these columns to analyze your fraud detection performance.
+        """)
+
+
+if __name__ == "__main__":
+    # Only a standalone run owns the page; main.py configures it when embedding the dashboard
+    st.set_page_config(
+        page_title="Fraud Analysis Dashboard",
+        page_icon="🔍",
+        layout="wide"
+    )
+    render_dashboard()
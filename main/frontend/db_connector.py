@@ -1,9 +1,19 @@
 import os
 import mysql.connector
+from mysql.connector import pooling
 import pandas as pd
+import redis
+import streamlit as st
 from dotenv import load_dotenv
 import logging
 from datetime import datetime
+from urllib.parse import quote_plus
+
+# Optional: connectorx reads query results straight into Arrow buffers from a native client
+try:
+    import connectorx as cx
+except ImportError:
+    cx = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -11,28 +21,82 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 DATA_DIR = "data"
-LATEST_FILE = os.path.join(DATA_DIR, "latest_transactions.csv")
-HISTORY_FILE = os.path.join(DATA_DIR, "transaction_history.csv")
+LATEST_FILE = os.path.join(DATA_DIR, "latest_transactions.parquet")
+HISTORY_FILE = os.path.join(DATA_DIR, "transaction_history.parquet")
 
 os.makedirs(DATA_DIR, exist_ok=True)
-new_data_available = False
+
+DB_URL = "mysql://{}:{}@{}/{}".format(
+    quote_plus(os.getenv("DB_USERNAME") or ""),
+    quote_plus(os.getenv("DB_PASSWORD") or ""),
+    os.getenv("DB_HOST"),
+    os.getenv("DB_DB")
+)
+
+db_pool = None
+
+# Summary of the last snapshot written to disk, so an unchanged poll leaves the files (and their mtime) alone
+_last_snapshot = None
 
 def get_db_connection():
     """
-    Establish a connection to the MySQL database using environment variables.
+    Borrow a connection from the shared MySQL pool, creating the pool on first use.
+    Calling close() on the connection returns it to the pool.
     """
+    global db_pool
     try:
-        return mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USERNAME"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_DB")
-        )
+        if db_pool is None:
+            db_pool = pooling.MySQLConnectionPool(
+                pool_name="txn",
+                pool_size=int(os.getenv("DB_POOL_SIZE", 8)),
+                host=os.getenv("DB_HOST"),
+                user=os.getenv("DB_USERNAME"),
+                password=os.getenv("DB_PASSWORD"),
+                database=os.getenv("DB_DB")
+            )
+        return db_pool.get_connection()
     except mysql.connector.Error as e:
         logger.error(f"Error connecting to MySQL database: {e}")
         return None
 
 
+# Redis keys of the backend's cached rule set; bumping the generation stops a backend rebuild
+# that read the old rules from caching them
+RULES_CACHE_KEY = "v1:fraud_rules:active"
+RULES_CACHE_GEN = f"{RULES_CACHE_KEY}:gen"
+
+redis_client = None
+
+
+def invalidate_rules_cache():
+    """
+    Make the backend reload fraud rules after they change. Best effort: Redis being down only delays the reload.
+    """
+    global redis_client
+    try:
+        if redis_client is None:
+            redis_client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_timeout=0.5)
+        with redis_client.pipeline() as pipe:
+            pipe.incr(RULES_CACHE_GEN)
+            pipe.delete(RULES_CACHE_KEY)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not invalidate the cached rules: {e}")
+
+
+def write_parquet_atomic(df, path):
+    """
+    Write a DataFrame to Parquet via a temp file and os.replace, so readers never see a partial file.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
 def fetch_transactions(limit=1000):
     """
     Fetch transactions from the MySQL database.
@@ -44,12 +108,10 @@ def fetch_transactions(limit=1000):
         DataFrame: Pandas DataFrame with transaction data or None if error
     """
     try:
-        conn = get_db_connection()
-        if conn is None:
-            return None
-
-        # Query matches the exact columns from checker.py and transaction structure
-        query = f"""
+        # Only the columns the dashboard reads; flags arrive as 0/1 with NULL counted as not fraud.
+        # ORDER BY ... LIMIT is served straight from an index rather than a filesort given:
+        #   CREATE INDEX idx_txn_date ON transactions (transaction_date DESC);
+        query = """
         SELECT 
             transaction_id_anonymous as Transaction_ID,
             payee_id_anonymous as Payee_ID,
@@ -58,36 +120,45 @@ def fetch_transactions(limit=1000):
             transaction_channel as Transaction_Channel,
             transaction_payment_mode_anonymous as Transaction_Payment_Mode,
             payment_gateway_bank_anonymous as Payment_Gateway_Bank,
-            is_fraud_rule as is_fraud_rule,
-            is_fraud_predict as is_fraud_predicted,
-            transaction_date as Timestamp,
-            payer_browser_anonymous,
-            payee_ip_anonymous,
-            payer_mobile_anonymous
+            (COALESCE(is_fraud_rule, 0) <> 0) as is_fraud_rule,
+            (COALESCE(is_fraud_predict, 0) <> 0) as is_fraud_predicted,
+            transaction_date as Timestamp
         FROM transactions
         ORDER BY transaction_date DESC
-        LIMIT {limit}
+        LIMIT %s
         """
 
-        df = pd.read_sql(query, conn)
-        conn.close()
+        if cx is not None:
+            # No partition_on: each partition would apply its own ORDER BY/LIMIT
+            # connectorx has no parameter binding, so bind the validated integer here
+            df = cx.read_sql(DB_URL, query % int(limit), return_type="pandas")
+        else:
+            conn = get_db_connection()
+            if conn is None:
+                return None
+            try:
+                df = pd.read_sql(query, conn, params=(int(limit),))
+            finally:
+                # Returned to the pool even when the query fails, so errors can't drain it
+                conn.close()
 
         # Process data for the dashboard
         if not df.empty:
-            # Map boolean columns
-            df['is_fraud_predicted'] = df['is_fraud_predicted'].astype(bool)
-            df['is_fraud_rule'] = df['is_fraud_rule'].astype(bool)
-
-            # Ensure timestamp format is consistent
-            df['Timestamp'] = pd.to_datetime(df['Timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
-
-            # Save to files for dashboard
-            df.to_csv(LATEST_FILE, index=False)
-            df.to_csv(HISTORY_FILE, index=False)
-
-            # Set new data flag
-            global new_data_available
-            new_data_available = True
+            # Flags are already 0/1 integers; this is a plain integer-to-bool cast
+            df = df.astype({'is_fraud_predicted': bool, 'is_fraud_rule': bool})
+
+            # Keep Timestamp as datetime64; the dashboard formats it only for display
+            if not pd.api.types.is_datetime64_any_dtype(df['Timestamp']):
+                df['Timestamp'] = pd.to_datetime(df['Timestamp'], format="%Y-%m-%d %H:%M:%S", cache=True)
+
+            # Save to files for dashboard; Parquet keeps the column types, so readers skip re-parsing.
+            # History first: LATEST_FILE's mtime is the new-data signal, so it is only touched on change
+            global _last_snapshot
+            snapshot = (len(df), df['Transaction_ID'].iat[0], df['Timestamp'].max())
+            if snapshot != _last_snapshot or not os.path.exists(LATEST_FILE):
+                write_parquet_atomic(df, HISTORY_FILE)
+                write_parquet_atomic(df, LATEST_FILE)
+                _last_snapshot = snapshot
 
             return df
         else:
@@ -99,15 +170,23 @@ def fetch_transactions(limit=1000):
         return None
 
 
+def _latest_mtime():
+    try:
+        return os.path.getmtime(LATEST_FILE)
+    except OSError:
+        return 0.0
+
+
 def has_new_data():
     """
     Check if new transaction data is available.
 
+    The signal is LATEST_FILE's mtime, so writes from any process are seen without a shared flag or lock.
+
     Returns:
-        bool: True if new data is available, False otherwise
+        bool: True if LATEST_FILE changed since this session last reset the flag, False otherwise
     """
-    global new_data_available
-    return new_data_available
+    return _latest_mtime() > st.session_state.get("last_seen_mtime", 0.0)
 
 
 def reset_new_data_flag():
@@ -116,8 +195,7 @@ def reset_new_data_flag():
 
     This should be called after the new data has been processed.
     """
-    global new_data_available
-    new_data_available = False
+    st.session_state["last_seen_mtime"] = _latest_mtime()
 
 
 def update_transactions():
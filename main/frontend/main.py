@@ -1,9 +1,8 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
-import sys
-import subprocess
 import time
 from dotenv import load_dotenv
 
@@ -21,19 +20,12 @@ ADMIN_USERNAME = "admin"
 ADMIN_PASSWORD = "admin"
 
 
-# Function to run external Streamlit scripts
-def run_streamlit_script(script_path):
-    try:
-        # Run the script in a subprocess
-        process = subprocess.Popen(
-            [sys.executable, "-m", "streamlit", "run", script_path],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        # Wait for process to complete (or set a timeout)
-        return f"Running {script_path}"
-    except Exception as e:
-        return f"Error running {script_path}: {str(e)}"
+@st.cache_resource
+def api_session():
+    # One keep-alive connection pool to the backend, shared across reruns and sessions
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
 
 
 # Initialize session state
@@ -122,7 +114,7 @@ elif st.session_state.active_view == "payment":
             API_URL = "http://127.0.0.1:8000/detect"
 
             try:
-                response = requests.post(API_URL, json=transaction_data)
+                response = api_session().post(API_URL, json=transaction_data, timeout=3)
 
                 if response.status_code == 200:
                     result = response.json()
@@ -175,79 +167,65 @@ elif st.session_state.active_view == "admin_login":
             st.error("Invalid username or password")
 
 elif st.session_state.active_view == "dashboard" and st.session_state.logged_in:
-    st.title("📊 Fraud Analysis Dashboard")
-
-    st.write("Loading dashboard...")
-    run_streamlit_script("dashboard.py")
-    st.write("Dashboard Loaded")
-    # Add simplified dashboard content di
+    # Rendered in-process so it shares this server, session and caches
+    from dashboard import render_dashboard
+    render_dashboard()
 
 elif st.session_state.active_view == "rules" and st.session_state.logged_in:
     st.title("⚙️ Fraud Detection Rule Management")
 
     # Import rule management functions
-    import mysql.connector
     import pandas as pd
 
-
-    # ---- MySQL Connection ----
-    def get_db_connection():
-        return mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USERNAME"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_DB")
-        )
+    # ---- MySQL Connection (shared pool) and backend rule cache invalidation ----
+    from db_connector import get_db_connection, invalidate_rules_cache
 
 
     # ---- Function to Fetch Rules ----
+    # Cached so widget reruns reuse the last result; failures raise and are not cached
+    @st.cache_data(ttl=30, show_spinner=False)
     def fetch_rules():
+        conn = get_db_connection()
+        if conn is None:
+            raise ConnectionError("could not connect to the database")
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM fraud_rules WHERE is_active = 1")
-            rules = cursor.fetchall()
+            with conn.cursor(dictionary=True) as cursor:
+                cursor.execute("SELECT * FROM fraud_rules WHERE is_active = 1")
+                rules = cursor.fetchall()
+        finally:
             conn.close()
-            return pd.DataFrame(rules) if rules else pd.DataFrame()
-        except Exception as e:
-            st.error(f"Error fetching rules: {str(e)}")
-            return pd.DataFrame()
+        return pd.DataFrame(rules) if rules else pd.DataFrame()
+
+
+    # ---- Column that holds the value for each rule type ----
+    RULE_COLUMNS = {
+        "Threshold Value": "threshold",
+        "Blocked IP": "blocked_ip",
+        "Blocked Payment Gateway": "blocked_payment_gateway",
+        "Blocked Browser": "blocked_payer_browser",
+        "Blocked Email": "blocked_email"
+    }
 
 
     # ---- Function to Add a Rule ----
     def add_rule(rule_type, value):
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-
-            if rule_type == "Threshold Value":
-                cursor.execute(
-                    """INSERT INTO fraud_rules (rule_type, threshold, is_active) 
-                    VALUES (%s, %s, 1)""", (rule_type, value)
-                )
-            elif rule_type == "Blocked IP":
-                cursor.execute(
-                    """INSERT INTO fraud_rules (rule_type, blocked_ip, is_active) 
-                    VALUES (%s, %s, 1)""", (rule_type, value)
-                )
-            elif rule_type == "Blocked Payment Gateway":
-                cursor.execute(
-                    """INSERT INTO fraud_rules (rule_type, blocked_payment_gateway, is_active) 
-                    VALUES (%s, %s, 1)""", (rule_type, value)
-                )
-            elif rule_type == "Blocked Browser":
-                cursor.execute(
-                    """INSERT INTO fraud_rules (rule_type, blocked_payer_browser, is_active) 
-                    VALUES (%s, %s, 1)""", (rule_type, value)
-                )
-            elif rule_type == "Blocked Email":
-                cursor.execute(
-                    """INSERT INTO fraud_rules (rule_type, blocked_email, is_active) 
-                    VALUES (%s, %s, 1)""", (rule_type, value)
-                )
-
-            conn.commit()
-            conn.close()
+            if conn is None:
+                raise ConnectionError("could not connect to the database")
+            try:
+                # Only the target column differs per rule type, so one prepared INSERT covers them all
+                column = RULE_COLUMNS[rule_type]
+                with conn.cursor(prepared=True) as cursor:
+                    cursor.execute(
+                        f"INSERT INTO fraud_rules (rule_type, {column}, is_active) VALUES (%s, %s, 1)",
+                        (rule_type, value)
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+            invalidate_rules_cache()
+            fetch_rules.clear()
             return True
         except Exception as e:
             st.error(f"Error adding rule: {str(e)}")
@@ -257,10 +235,16 @@ elif st.session_state.active_view == "rules" and st.session_state.logged_in:
     def delete_rule(rule_id):
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM fraud_rules WHERE id = %s", (rule_id,))
-            conn.commit()
-            conn.close()
+            if conn is None:
+                raise ConnectionError("could not connect to the database")
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM fraud_rules WHERE id = %s", (rule_id,))
+                conn.commit()
+            finally:
+                conn.close()
+            invalidate_rules_cache()
+            fetch_rules.clear()
             return True
         except Exception as e:
             st.error(f"Error deleting rule: {str(e)}")
@@ -268,50 +252,75 @@ elif st.session_state.active_view == "rules" and st.session_state.logged_in:
 
 
     # ---- Streamlit UI ----
-    st.subheader("Active Fraud Rules")
-    rules_df = fetch_rules()
+    # Each section is a fragment, so typing in one form reruns only that form.
+    # A successful add/delete still does a full rerun so the rules table refreshes.
+    @st.fragment
+    def rules_table_fragment():
+        try:
+            rules_df = fetch_rules()
+        except Exception as e:
+            st.error(f"Error fetching rules: {str(e)}")
+            rules_df = pd.DataFrame()
+        st.session_state["rules_df"] = rules_df
+
+        if not rules_df.empty:
+            st.dataframe(rules_df, height=300)
+        else:
+            st.info("No active rules found. Add some rules below.")
+
+
+    @st.fragment
+    def add_rule_fragment():
+        with st.expander("Add New Rule"):
+            rule_type = st.selectbox("Rule Type", [
+                "Threshold Value",
+                "Blocked IP",
+                "Blocked Payment Gateway",
+                "Blocked Browser",
+                "Blocked Email"
+            ])
+
+            if rule_type == "Threshold Value":
+                value = st.number_input("Enter Maximum Threshold Value", min_value=0.0)
+            else:
+                value = st.text_input(
+                    f"Enter {rule_type.replace('Blocked ', '')} to Block",
+                    help="Use * as a wildcard, e.g. *@example.com"
+                )
+
+            if st.button("Add Rule"):
+                if value:
+                    if add_rule(rule_type, value):
+                        st.success("Rule Added Successfully!")
+                        time.sleep(1)
+                        st.rerun()
+                else:
+                    st.warning("Please enter a value for the rule")
+
+
+    @st.fragment
+    def delete_rule_fragment():
+        with st.expander("Delete Rule"):
+            if not st.session_state.get("rules_df", pd.DataFrame()).empty:
+                rule_id = st.number_input("Enter Rule ID to Delete", min_value=1, step=1)
+                if st.button("Delete Rule"):
+                    if delete_rule(rule_id):
+                        st.warning("Rule Deleted Successfully!")
+                        time.sleep(1)
+                        st.rerun()
+            else:
+                st.info("No rules to delete")
+
 
-    if not rules_df.empty:
-        st.dataframe(rules_df, height=300)
-    else:
-        st.info("No active rules found. Add some rules below.")
+    st.subheader("Active Fraud Rules")
+    rules_table_fragment()
 
     # ➕ Add New Rule
     st.subheader("Manage Rules")
-    with st.expander("Add New Rule"):
-        rule_type = st.selectbox("Rule Type", [
-            "Threshold Value",
-            "Blocked IP",
-            "Blocked Payment Gateway",
-            "Blocked Browser",
-            "Blocked Email"
-        ])
-
-        if rule_type == "Threshold Value":
-            value = st.number_input("Enter Maximum Threshold Value", min_value=0.0)
-        else:
-            value = st.text_input(f"Enter {rule_type.replace('Blocked ', '')} to Block")
-
-        if st.button("Add Rule"):
-            if value:
-                if add_rule(rule_type, value):
-                    st.success("Rule Added Successfully!")
-                    time.sleep(1)
-                    st.rerun()
-            else:
-                st.warning("Please enter a value for the rule")
+    add_rule_fragment()
 
     st.subheader("Delete Rule")
-    with st.expander("Delete Rule"):
-        if not rules_df.empty:
-            rule_id = st.number_input("Enter Rule ID to Delete", min_value=1, step=1)
-            if st.button("Delete Rule"):
-                if delete_rule(rule_id):
-                    st.warning("Rule Deleted Successfully!")
-                    time.sleep(1)
-                    st.rerun()
-        else:
-            st.info("No rules to delete")
+    delete_rule_fragment()
 
 else:
     st.error("Access denied. Please login as an admin.")
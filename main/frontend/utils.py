@@ -1,90 +1,292 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from datetime import datetime, timedelta
-from sklearn.metrics import confusion_matrix, precision_score, recall_score
 
+# Optional: Polars parses text columns in parallel Rust kernels
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
-def process_data(data):
+# Optional: Numba compiles the confusion-matrix counting loop into a parallel native loop
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Columns process_data needs, in the order the dashboard reads them
+REQUIRED_COLUMNS = (
+    'Transaction_ID',
+    'Timestamp',
+    'Payer_ID',
+    'Payee_ID',
+    'is_fraud_predicted',
+    'is_fraud_rule',
+    'Transaction_Channel',
+    'Transaction_Payment_Mode',
+    'Payment_Gateway_Bank',
+    'Amount'
+)
+# Derived column holding each row's calendar day as days since 1970-01-01, for integer date filtering
+DAY_COLUMN = '_ts_day'
+# Derived column holding each Transaction ID lowercased, so the ID search needs no per-call case folding
+TID_LOWER_COLUMN = '_tid_lower'
+# Chart bucket size per time frame selection
+TIME_GRANULARITY = {
+    "Last 7 days": 'D',  # Daily
+    "Last 30 days": 'D',  # Daily
+    "Last 90 days": 'W',  # Weekly
+    "Last year": 'M'  # Monthly
+}
+# Text spellings of a true flag, compared after strip() and lower(); anything else counts as False
+TRUE_STRINGS = np.array(['true', 't', 'yes', 'y', '1'])
+# The single-character spellings above as a code point table, for columns whose values are all one character
+TRUE_CHARS = np.zeros(256, dtype=np.bool_)
+TRUE_CHARS[[ord(c) for c in 'TtYy1']] = True
+# Timestamp layouts Polars may parse; anything else (other orders, UTC offsets) goes through pandas
+POLARS_TIMESTAMP_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S%.f',
+    '%Y-%m-%dT%H:%M:%S%.f',
+    '%Y-%m-%d'
+)
+# Currency symbols and thousands separators dropped from text amounts
+AMOUNT_STRIP = str.maketrans('', '', '$,₹€£')
+
+
+def _polars_text(series):
+    """The column as a Polars string Series, or None when Polars is missing or the values are not all text."""
+    if pl is None or series.dtype != object:
+        return None
+    try:
+        return pl.from_pandas(series).cast(pl.String)
+    except Exception:
+        return None
+
+
+def process_data(data, copy=True):
     """
     Process uploaded data to ensure it has the required columns and format.
     Handles common data formatting issues.
 
     Args:
         data (DataFrame): Raw uploaded data
+        copy (bool): If False, `data` itself may be modified (for frames the caller owns); use the return value
 
     Returns:
         DataFrame: Processed data ready for analysis
     """
-    required_columns = [
-        'Transaction_ID',
-        'Timestamp',
-        'Payer_ID',
-        'Payee_ID',
-        'is_fraud_predicted',
-        'is_fraud_rule',
-        'Transaction_Channel',
-        'Transaction_Payment_Mode',
-        'Payment_Gateway_Bank',
-        'Amount'
-    ]
-
-    # Check for required columns
-    missing_columns = set(required_columns) - set(data.columns)
+    # Check for required columns (hash lookups into the existing column index, no per-call sets)
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in data.columns]
     if missing_columns:
         raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
 
-    # Create a copy to avoid modifying the original
-    processed_data = data.copy()
+    # Every step below replaces whole columns rather than writing into them,
+    # so a shallow copy is enough to leave the caller's frame untouched
+    processed_data = data.copy(deep=False) if copy else data
 
     # Convert timestamp to datetime if not already
     if not pd.api.types.is_datetime64_any_dtype(processed_data['Timestamp']):
         try:
-            processed_data['Timestamp'] = pd.to_datetime(processed_data['Timestamp'])
+            # Parse once here; everything downstream uses the datetime64 column directly
+            parsed = None
+            text = _polars_text(processed_data['Timestamp'])
+            if text is not None:
+                # Only explicit, unambiguous ISO layouts: Polars' own format inference reads 03/04 as
+                # day-first and converts offsets to UTC, where pandas does neither
+                for layout in POLARS_TIMESTAMP_FORMATS:
+                    try:
+                        parsed = text.str.to_datetime(format=layout, strict=True).to_numpy()
+                        break
+                    except Exception:
+                        # Other layouts, offsets or mixed values: try the next one, then leave them to pandas below
+                        parsed = None
+            if parsed is not None:
+                processed_data['Timestamp'] = parsed
+            else:
+                try:
+                    processed_data['Timestamp'] = pd.to_datetime(processed_data['Timestamp'], format='ISO8601', cache=True)
+                except ValueError:
+                    # Uploaded files may use other date layouts
+                    processed_data['Timestamp'] = pd.to_datetime(processed_data['Timestamp'], cache=True)
         except Exception as e:
             raise ValueError(f"Error converting Timestamp column to datetime: {str(e)}")
 
+    # Keep tz-aware input at its local wall-clock time, tz-naive, so plain datetime64 comparisons work downstream
+    if isinstance(processed_data['Timestamp'].dtype, pd.DatetimeTZDtype):
+        processed_data['Timestamp'] = processed_data['Timestamp'].dt.tz_localize(None)
+
     # Ensure boolean columns are properly formatted
     for col in ['is_fraud_predicted', 'is_fraud_rule']:
+        # Already-processed frames carry int8 flags; the checks below only cost a dtype lookup for them
+        if processed_data[col].dtype == np.int8:
+            continue
         if not pd.api.types.is_bool_dtype(processed_data[col]):
             # Try to convert various formats to boolean
             try:
                 # Handle different representations (0/1, True/False, Yes/No, etc.)
                 if processed_data[col].dtype == 'object':
-                    processed_data[col] = processed_data[col].map({
-                        'True': True, 'true': True, 'TRUE': True, 'T': True, 'Yes': True, 'yes': True, 'Y': True,
-                        '1': True, 1: True,
-                        'False': False, 'false': False, 'FALSE': False, 'F': False, 'No': False, 'no': False,
-                        'N': False, '0': False, 0: False
-                    })
+                    stripped = processed_data[col].astype(str).str.strip().to_numpy().astype('U')
+                    if stripped.dtype.itemsize <= 4:
+                        # Every value is at most one UCS-4 character: read the code points as integers
+                        # and resolve them with a single gather from the 256-entry table
+                        chars = stripped.astype('U1').view(np.uint32)
+                        processed_data[col] = TRUE_CHARS[np.minimum(chars, 255)] & (chars < 256)
+                    else:
+                        # Longer values must match a spelling exactly; one hashed membership test
+                        processed_data[col] = np.isin(np.char.lower(stripped), TRUE_STRINGS)
                 else:
                     processed_data[col] = processed_data[col].astype(bool)
             except Exception as e:
                 raise ValueError(f"Error converting {col} to boolean: {str(e)}")
 
+        # Store flags as int8 so sums are contiguous integer reductions; unmapped values count as False
+        processed_data[col] = processed_data[col].fillna(False).astype('int8')
+
     # Ensure Amount is numeric
     if not pd.api.types.is_numeric_dtype(processed_data['Amount']):
         try:
-            # Remove currency symbols and commas if present
-            if processed_data['Amount'].dtype == 'object':
-                processed_data['Amount'] = processed_data['Amount'].replace({
-                    '[$,₹,€,£]': '',
-                    ',': ''
-                }, regex=True)
-            processed_data['Amount'] = pd.to_numeric(processed_data['Amount'])
+            parsed = None
+            text = _polars_text(processed_data['Amount'])
+            if text is not None:
+                try:
+                    parsed = text.str.replace_all(r"[$₹€£,]", "").cast(pl.Float64, strict=True).to_numpy()
+                except Exception:
+                    parsed = None
+            if parsed is not None:
+                processed_data['Amount'] = parsed
+            else:
+                # Remove currency symbols and commas if present, in one translate pass instead of two regex passes
+                if processed_data['Amount'].dtype == 'object':
+                    processed_data['Amount'] = processed_data['Amount'].astype(str).str.translate(AMOUNT_STRIP)
+                processed_data['Amount'] = pd.to_numeric(processed_data['Amount'])
         except Exception as e:
             raise ValueError(f"Error converting Amount to numeric: {str(e)}")
 
-    # Ensure IDs are strings for consistent handling
-    for col in ['Transaction_ID', 'Payer_ID', 'Payee_ID']:
-        processed_data[col] = processed_data[col].astype(str)
+    # Day index for filter_data: one int32 compare per row instead of datetime64 bounds.
+    # NaT rows get the smallest int32, so no date range ever includes them
+    timestamps = processed_data['Timestamp']
+    processed_data[DAY_COLUMN] = np.where(
+        timestamps.isna().to_numpy(),
+        np.iinfo(np.int32).min,
+        timestamps.to_numpy().astype('datetime64[D]').astype(np.int64)
+    ).astype(np.int32)
 
-    # Fill any missing categorical values with 'Unknown'
+    # float32 halves the bandwidth of every mask over Amount. Individual amounts stay accurate to the
+    # cent up to roughly 100,000; totals are accumulated in float64 by the dashboard
+    if processed_data['Amount'].dtype != np.float32:
+        processed_data['Amount'] = processed_data['Amount'].astype(np.float32)
+
+    # Transaction IDs are unique, so keep them as Arrow strings: compact, and str.contains runs in Arrow's C kernel
+    if processed_data['Transaction_ID'].dtype != 'string[pyarrow]':
+        processed_data['Transaction_ID'] = processed_data['Transaction_ID'].astype('string[pyarrow]')
+
+    # Lowercase the IDs once here; on Arrow strings this is a single utf8_lower kernel
+    if TID_LOWER_COLUMN not in processed_data.columns:
+        processed_data[TID_LOWER_COLUMN] = processed_data['Transaction_ID'].str.lower()
+
+    # Payer and payee IDs repeat across rows, so store them as categoricals for cheap isin/groupby
+    for col in ['Payer_ID', 'Payee_ID']:
+        if not isinstance(processed_data[col].dtype, pd.CategoricalDtype):
+            processed_data[col] = processed_data[col].astype(str).astype('category')
+
+    # Fill any missing categorical values with 'Unknown'; columns without gaps are left as they are
     for col in ['Transaction_Channel', 'Transaction_Payment_Mode', 'Payment_Gateway_Bank']:
-        processed_data[col] = processed_data[col].fillna('Unknown')
+        column = processed_data[col]
+        if not column.isna().any():
+            continue
+        if isinstance(column.dtype, pd.CategoricalDtype) and 'Unknown' not in column.cat.categories:
+            column = column.cat.add_categories('Unknown')
+        processed_data[col] = column.fillna('Unknown')
 
+    # Record the time span once so callers don't rescan the column. ISO strings keep attrs JSON-serializable.
+    # pandas copies attrs onto frames derived from this one, so only trust them on the frame returned here
+    ts_min, ts_max = processed_data['Timestamp'].min(), processed_data['Timestamp'].max()
+    processed_data.attrs['ts_min'] = None if pd.isna(ts_min) else ts_min.isoformat()
+    processed_data.attrs['ts_max'] = None if pd.isna(ts_max) else ts_max.isoformat()
+    # Content hash of the dashboard columns, hashed once here so the dashboard's caches can key on it
+    processed_data.attrs['content_hash'] = content_hash(processed_data)
     return processed_data
 
 
+def content_hash(data):
+    """
+    Hash every row of the dashboard columns into one integer, for cache keys
+
+    Args:
+        data (DataFrame): Processed data
+
+    Returns:
+        int: Order-sensitive hash of the frame's contents
+    """
+    # Weight each row hash by its position so reordered rows hash differently; uint64 arithmetic wraps
+    row_hashes = pd.util.hash_pandas_object(data[list(REQUIRED_COLUMNS)], index=False).to_numpy()
+    positions = np.arange(1, len(row_hashes) + 1, dtype=np.uint64)
+    return int((row_hashes * positions).sum())
+
+
+def process_data_arrow(table):
+    """
+    Process an Arrow table (e.g. from Parquet or Feather) without going through object columns.
+    Type fixups run as Arrow compute kernels before a single conversion to pandas.
+
+    Args:
+        table (pyarrow.Table): Raw transaction table
+
+    Returns:
+        DataFrame: Processed data ready for analysis, as from process_data
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in table.schema.names]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+
+    def replace(name, column):
+        nonlocal table
+        table = table.set_column(table.schema.get_field_index(name), name, column)
+
+    if pa.types.is_string(table.schema.field('Timestamp').type):
+        try:
+            replace('Timestamp', pc.cast(table['Timestamp'], pa.timestamp('ns')))
+        except pa.ArrowInvalid:
+            # Non-ISO layouts are left to pandas' parser in process_data
+            pass
+
+    # Bool or integer flags become non-null int8 here; text flags are left to process_data
+    for col in ['is_fraud_predicted', 'is_fraud_rule']:
+        field_type = table.schema.field(col).type
+        if pa.types.is_boolean(field_type) or pa.types.is_integer(field_type):
+            flags = pc.fill_null(pc.cast(table[col], pa.bool_()), False)
+            replace(col, pc.cast(flags, pa.int8()))
+
+    if pa.types.is_integer(table.schema.field('Amount').type) or \
+            pa.types.is_floating(table.schema.field('Amount').type):
+        replace('Amount', pc.cast(table['Amount'], pa.float32()))
+
+    # Dictionary columns arrive in pandas as categoricals
+    for col in ['Payer_ID', 'Payee_ID', 'Transaction_Channel', 'Transaction_Payment_Mode', 'Payment_Gateway_Bank']:
+        column = table[col]
+        if not pa.types.is_dictionary(column.type):
+            if col in ('Transaction_Channel', 'Transaction_Payment_Mode', 'Payment_Gateway_Bank'):
+                column = pc.fill_null(pc.cast(column, pa.string()), 'Unknown')
+            else:
+                column = pc.cast(column, pa.string())
+            replace(col, pc.dictionary_encode(column))
+
+    replace('Transaction_ID', pc.cast(table['Transaction_ID'], pa.string()))
+
+    # self_destruct frees each Arrow column as soon as it has been handed to pandas
+    data = table.to_pandas(
+        self_destruct=True,
+        types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get
+    )
+    # Whatever Arrow could not fix (text dates, text flags, text amounts) goes through the pandas path;
+    # the rest only costs process_data a dtype check
+    return process_data(data, copy=False)
+
+
 def filter_data(data, date_range=None, payer_id=None, payee_id=None, transaction_id=None):
     """
     Filter data based on user-selected criteria
@@ -99,30 +301,50 @@ def filter_data(data, date_range=None, payer_id=None, payee_id=None, transaction
     Returns:
         DataFrame: Filtered data
     """
-    filtered_data = data.copy()
+    # Build one boolean mask and index once, instead of copying the frame per filter
+    mask = np.ones(len(data), dtype=bool)
 
     # Apply date range filter
     if date_range is not None and len(date_range) == 2:
         start_date, end_date = date_range
-        filtered_data = filtered_data[
-            (pd.to_datetime(filtered_data['Timestamp']).dt.date >= start_date) &
-            (pd.to_datetime(filtered_data['Timestamp']).dt.date <= end_date)
-            ]
+        if DAY_COLUMN in data.columns:
+            # Inclusive day range against process_data's int32 day index
+            days = data[DAY_COLUMN].to_numpy()
+            mask &= (days >= np.datetime64(start_date, 'D').astype(np.int64)) & \
+                    (days <= np.datetime64(end_date, 'D').astype(np.int64))
+        else:
+            # process_data guarantees datetime64, so compare the raw int64-backed array against day bounds
+            timestamps = data['Timestamp']
+            if timestamps.dt.tz is not None:
+                timestamps = timestamps.dt.tz_localize(None)
+            timestamps = timestamps.to_numpy()
+            mask &= (timestamps >= np.datetime64(start_date)) & \
+                    (timestamps < np.datetime64(end_date) + np.timedelta64(1, 'D'))
 
-    # Apply Payer ID filter
+    # Apply Payer ID filter (categorical, so isin compares integer codes)
     if payer_id is not None and len(payer_id) > 0:
-        filtered_data = filtered_data[filtered_data['Payer_ID'].isin(payer_id)]
+        mask &= data['Payer_ID'].isin(payer_id).to_numpy()
 
     # Apply Payee ID filter
     if payee_id is not None and len(payee_id) > 0:
-        filtered_data = filtered_data[filtered_data['Payee_ID'].isin(payee_id)]
+        mask &= data['Payee_ID'].isin(payee_id).to_numpy()
 
-    # Apply Transaction ID search
+    # Apply Transaction ID search (a literal substring, so no regex compile per call)
     if transaction_id is not None and transaction_id.strip() != "":
-        filtered_data = filtered_data[
-            filtered_data['Transaction_ID'].str.contains(transaction_id, case=False, na=False)]
+        # Frames from process_data carry pre-lowercased IDs, so only the needle needs folding
+        if TID_LOWER_COLUMN in data.columns:
+            ids, needle, ignore_case = data[TID_LOWER_COLUMN], transaction_id.lower(), False
+        else:
+            ids, needle, ignore_case = data['Transaction_ID'], transaction_id, True
+        if ids.dtype == 'string[pyarrow]':
+            # Substring search straight over the Arrow UTF-8 buffers
+            matches = pc.match_substring(pa.array(ids), needle, ignore_case=ignore_case)
+            mask &= pc.fill_null(matches, False).to_numpy()
+        else:
+            mask &= ids.str.contains(needle, case=not ignore_case, regex=False, na=False).to_numpy()
 
-    return filtered_data
+    # Indexing once at the end is the only copy filter_data makes
+    return data.loc[mask]
 
 
 def get_time_granularity(time_frame):
@@ -135,16 +357,54 @@ def get_time_granularity(time_frame):
     Returns:
         str: Time granularity code ('H', 'D', 'W', or 'M')
     """
-    if time_frame == "Last 7 days":
-        return 'D'  # Daily
-    elif time_frame == "Last 30 days":
-        return 'D'  # Daily
-    elif time_frame == "Last 90 days":
-        return 'W'  # Weekly
-    elif time_frame == "Last year":
-        return 'M'  # Monthly
-    else:  # All time
-        return 'M'  # Monthly
+    # Anything else (All time) is monthly
+    return TIME_GRANULARITY.get(time_frame, 'M')
+
+
+def _confusion_counts(actual, predicted, selected):
+    # Each selected row lands in bin 2*actual + predicted, so the counts come out as [tn, fp, fn, tp];
+    # unselected rows go to bin 4, which is dropped
+    tn, fp, fn, tp = np.bincount(np.where(selected, (actual << 1) | predicted, 4), minlength=5)[:4]
+    return tn, fp, fn, tp
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True, boundscheck=False)
+    def _confusion_counts(actual, predicted, selected):
+        tn = fp = fn = tp = 0
+        for i in numba.prange(actual.shape[0]):
+            if not selected[i]:
+                continue
+            if actual[i]:
+                if predicted[i]:
+                    tp += 1
+                else:
+                    fn += 1
+            elif predicted[i]:
+                fp += 1
+            else:
+                tn += 1
+        return tn, fp, fn, tp
+
+
+def count_confusion(y_true, y_pred, selected=None):
+    """
+    Count the confusion matrix cells in one pass over the labels
+
+    Args:
+        y_true (array): Actual fraud labels
+        y_pred (array): Predicted fraud labels
+        selected (array): Optional boolean mask of the rows to count
+
+    Returns:
+        tuple: (tn, fp, fn, tp) as plain ints
+    """
+    actual = np.ascontiguousarray(y_true, dtype=np.bool_).view(np.uint8)
+    predicted = np.ascontiguousarray(y_pred, dtype=np.bool_).view(np.uint8)
+    if selected is None:
+        selected = np.ones(actual.shape[0], dtype=np.bool_)
+    selected = np.ascontiguousarray(selected, dtype=np.bool_).view(np.uint8)
+    return tuple(int(count) for count in _confusion_counts(actual, predicted, selected))
 
 
 def calculate_metrics(y_true, y_pred):
@@ -158,15 +418,16 @@ def calculate_metrics(y_true, y_pred):
     Returns:
         dict: Dictionary containing performance metrics
     """
-    # Calculate confusion matrix
-    cm = confusion_matrix(y_true, y_pred)
-    tn, fp, fn, tp = cm.ravel()
+    # Confusion matrix in one pass; always 2x2, even when only one class is present
+    tn, fp, fn, tp = count_confusion(y_true, y_pred)
+    cm = np.array([[tn, fp], [fn, tp]])
 
     # Calculate metrics
-    precision = precision_score(y_true, y_pred, zero_division=0)
-    recall = recall_score(y_true, y_pred, zero_division=0)
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
     f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-    accuracy = (tp + tn) / (tp + tn + fp + fn)
+    total = tp + tn + fp + fn
+    accuracy = (tp + tn) / total if total > 0 else 0.0
 
     return {
         'confusion_matrix': cm,
@@ -1,12 +1,25 @@
 import os
+import io
+import asyncio
+import csv
 import json
+import logging
 from datetime import datetime
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
+from collections import deque
 import pandas as pd
-import threading
+
+# Optional: DuckDB scans the history file in vectorized C and keeps only the top rows
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Fraud Analysis API")
 
@@ -24,8 +37,22 @@ HISTORY_FILE = os.path.join(DATA_DIR, "transaction_history.csv")
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
-new_data_available = False
-new_data_lock = threading.Lock()
+_DDB = duckdb.connect() if duckdb is not None else None
+if _DDB is not None:
+    # One scan thread with insertion order kept, so LIMIT/OFFSET follow the file's row order
+    _DDB.execute("SET threads = 1")
+    _DDB.execute("SET preserve_insertion_order = true")
+
+# mtime of LATEST_FILE when this process last consumed it; the file write itself is the signal
+last_seen_mtime = 0.0
+# The single writer task flushes after this many rows or this many seconds, whichever comes first
+WRITE_BATCH_MAX = 256
+WRITE_FLUSH_SECONDS = 0.1
+
+# Accepted transactions waiting for the writer; created on startup inside the server's event loop.
+# None on the queue tells the writer to flush and exit
+txn_queue = None
+writer_task = None
 
 class Transaction(BaseModel):
     Transaction_ID: str
@@ -54,58 +81,122 @@ class Transaction(BaseModel):
             }
         }
 
-def process_transaction(transaction: Transaction):
-    global new_data_available
+def write_transactions(rows: List[dict]):
+    # Only the writer task calls this, so appends never interleave
+    fieldnames = list(rows[0])
+
+    # Append only the new rows; the header is written once when the file is created
+    write_header = not os.path.exists(HISTORY_FILE)
+    with open(HISTORY_FILE, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+    # Written last: its mtime tells readers the history already holds these rows.
+    # Swapped in with os.replace so a concurrent reader sees the old file or the new one, never a torn one
+    tmp = f"{LATEST_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerow(rows[-1])
+    os.replace(tmp, LATEST_FILE)
+
+async def history_writer():
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await txn_queue.get()
+        if item is None:
+            break
+        batch = [item]
+        deadline = loop.time() + WRITE_FLUSH_SECONDS
+        while len(batch) < WRITE_BATCH_MAX:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(txn_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        try:
+            await run_in_threadpool(write_transactions, batch)
+        except Exception:
+            # Keep draining the queue; a failed batch must not stop every later write
+            logger.exception(f"Failed to write {len(batch)} transactions; dropping the batch")
+
+@app.on_event("startup")
+async def startup():
+    global txn_queue, writer_task
+    txn_queue = asyncio.Queue()
+    writer_task = asyncio.create_task(history_writer())
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Queued behind every accepted transaction, so the writer flushes them all through the threadpool first
+    await txn_queue.put(None)
+    await writer_task
 
+@app.post("/transactions/", status_code=202)
+async def add_transaction(transaction: Transaction):
     if not transaction.Timestamp:
         transaction.Timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    transaction_df = pd.DataFrame([transaction.dict()])
-    transaction_df.to_csv(LATEST_FILE, index=False)
-
-    if os.path.exists(HISTORY_FILE):
-        history_df = pd.read_csv(HISTORY_FILE)
-        updated_history = pd.concat([history_df, transaction_df], ignore_index=True)
-        updated_history.to_csv(HISTORY_FILE, index=False)
-    else:
-        transaction_df.to_csv(HISTORY_FILE, index=False)
-
-    with new_data_lock:
-        new_data_available = True
-
-@app.post("/transactions/", status_code=202)
-async def add_transaction(background_tasks: BackgroundTasks, transaction: Transaction):
-    background_tasks.add_task(process_transaction, transaction)
+    await txn_queue.put(transaction.dict())
     return {"status": "accepted", "message": "Transaction is being processed"}
 
 @app.get("/health/")
 async def healthcheck():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+def read_transactions(limit: int) -> List[dict]:
+    # Blocking file scan; the endpoint runs it on the threadpool
+    limit = max(limit, 0)
+    if _DDB is not None:
+        # The last `limit` rows in file (append) order, like the tail below. Timestamp stays the stored string.
+        # A cursor per call, since threadpool callers must not share one DuckDB connection
+        cursor = _DDB.cursor()
+        source = "read_csv_auto(?, types={'Timestamp': 'VARCHAR'})"
+        total = cursor.execute(f"SELECT count(*) FROM {source}", [HISTORY_FILE]).fetchone()[0]
+        df = cursor.execute(
+            f"SELECT * FROM {source} LIMIT ? OFFSET ?",
+            [HISTORY_FILE, limit, max(total - limit, 0)]
+        ).df()
+    else:
+        # Keep only the header and the last `limit` lines in memory, then parse just those
+        with open(HISTORY_FILE, newline="") as f:
+            header = f.readline()
+            tail = deque(f, maxlen=limit)
+        df = pd.read_csv(io.StringIO(header + "".join(tail)))
+    if 'is_fraud_predicted' in df.columns:
+        df['is_fraud_predicted'] = df['is_fraud_predicted'].astype(bool)
+    if 'is_fraud_rule' in df.columns:
+        df['is_fraud_rule'] = df['is_fraud_rule'].astype(bool)
+    return df.to_dict(orient='records')
+
 @app.get("/transactions/")
 async def get_transactions(limit: int = 100):
     if os.path.exists(HISTORY_FILE):
         try:
-            df = pd.read_csv(HISTORY_FILE)
-            if len(df) > limit:
-                df = df.tail(limit)
-            if 'is_fraud_predicted' in df.columns:
-                df['is_fraud_predicted'] = df['is_fraud_predicted'].astype(bool)
-            if 'is_fraud_rule' in df.columns:
-                df['is_fraud_rule'] = df['is_fraud_rule'].astype(bool)
-            transactions = df.to_dict(orient='records')
+            transactions = await run_in_threadpool(read_transactions, limit)
             return {"transactions": transactions, "count": len(transactions)}
         except Exception as e:
             return {"error": f"Failed to read transactions: {str(e)}"}
     return {"transactions": [], "count": 0}
 
+def _latest_mtime():
+    try:
+        return os.path.getmtime(LATEST_FILE)
+    except OSError:
+        return 0.0
+
 def has_new_data():
-    global new_data_available
-    with new_data_lock:
-        return new_data_available
+    return _latest_mtime() > last_seen_mtime
 
 def reset_new_data_flag():
-    global new_data_available
-    with new_data_lock:
-        new_data_available = False
+    global last_seen_mtime
+    last_seen_mtime = _latest_mtime()
 
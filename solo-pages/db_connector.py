@@ -1,6 +1,7 @@
 import os
 import mysql.connector
 import pandas as pd
+import redis
 from dotenv import load_dotenv
 import logging
 from datetime import datetime
@@ -24,6 +25,30 @@ os.makedirs(DATA_DIR, exist_ok=True)
 new_data_available = False
 
 
+# Redis keys of the backend's cached rule set; bumping the generation stops a backend rebuild
+# that read the old rules from caching them
+RULES_CACHE_KEY = "v1:fraud_rules:active"
+RULES_CACHE_GEN = f"{RULES_CACHE_KEY}:gen"
+
+redis_client = None
+
+
+def invalidate_rules_cache():
+    """
+    Make the backend reload fraud rules after they change. Best effort: Redis being down only delays the reload.
+    """
+    global redis_client
+    try:
+        if redis_client is None:
+            redis_client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_timeout=0.5)
+        with redis_client.pipeline() as pipe:
+            pipe.incr(RULES_CACHE_GEN)
+            pipe.delete(RULES_CACHE_KEY)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not invalidate the cached rules: {e}")
+
+
 def get_db_connection():
     """
     Establish a connection to the MySQL database using environment variables.
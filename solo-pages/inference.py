@@ -1,8 +1,14 @@
 threshold = 0.019621696
-import  tensorflow as tf
+import numpy as np
+import tensorflow as tf
 model = tf.keras.models.load_model("/content/model_best.keras")
-reconstcution_a=model.predict(df_fraud)
-reconstruction_a = np.array(reconstcution_a, dtype=np.float32)
-df_fraud = np.array(df_fraud, dtype=np.float32)
-test_loss=tf.keras.losses.mae(reconstruction_a,df_fraud)
-tf.math.less(test_loss,threshold)
\ No newline at end of file
+
+@tf.function(jit_compile=True)
+def step(batch):
+    reconstruction = model(batch, training=False)
+    return tf.reduce_mean(tf.abs(reconstruction - batch), axis=1) < threshold
+
+def detect(df_fraud, batch_size=4096):
+    x = df_fraud.to_numpy(dtype=np.float32, copy=False)
+    ds = tf.data.Dataset.from_tensor_slices(x).batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    return tf.concat([step(batch) for batch in ds], axis=0)
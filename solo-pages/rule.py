@@ -2,6 +2,7 @@ import streamlit as st
 import mysql.connector
 import pandas as pd
 import os,dotenv
+from db_connector import invalidate_rules_cache
 
 dotenv.load_dotenv()
 
@@ -15,6 +16,7 @@ def get_db_connection():
         database=os.getenv("DB_DB")
     )
 
+@st.cache_data(ttl=30)
 def fetch_rules():
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
@@ -23,37 +25,25 @@ def fetch_rules():
     conn.close()
     return pd.DataFrame(rules)
 
+RULE_COLUMNS = {
+    "Threshold Value": "threshold",
+    "Blocked IP": "blocked_ip",
+    "Blocked Payment Gateway": "blocked_payment_gateway",
+    "Blocked Browser": "blocked_payer_browser",
+    "Blocked Email": "blocked_email"
+}
+
 def add_rule(rule_type, value):
     conn = get_db_connection()
-    cursor = conn.cursor()
-
-    if rule_type == "Threshold Value":
-        cursor.execute(
-            """INSERT INTO fraud_rules (rule_type, threshold) 
-            VALUES (%s, %s)""", (rule_type, value)
-        )
-    elif rule_type == "Blocked IP":
-        cursor.execute(
-            """INSERT INTO fraud_rules (rule_type, blocked_ip) 
-            VALUES (%s, %s)""", (rule_type, value)
-        )
-    elif rule_type == "Blocked Payment Gateway":
-        cursor.execute(
-            """INSERT INTO fraud_rules (rule_type, blocked_payment_gateway) 
-            VALUES (%s, %s)""", (rule_type, value)
-        )
-    elif rule_type == "Blocked Browser":
-        cursor.execute(
-            """INSERT INTO fraud_rules (rule_type, blocked_payer_browser) 
-            VALUES (%s, %s)""", (rule_type, value)
-        )
-    elif rule_type == "Blocked Email":
-        cursor.execute(
-            """INSERT INTO fraud_rules (rule_type, blocked_email) 
-            VALUES (%s, %s)""", (rule_type, value)
-        )
+    cursor = conn.cursor(prepared=True)
+    cursor.execute(
+        f"INSERT INTO fraud_rules (rule_type, {RULE_COLUMNS[rule_type]}) VALUES (%s, %s)",
+        (rule_type, value)
+    )
     conn.commit()
     conn.close()
+    invalidate_rules_cache()
+    fetch_rules.clear()
 
 def delete_rule(rule_id):
     conn = get_db_connection()
@@ -61,6 +51,8 @@ def delete_rule(rule_id):
     cursor.execute("DELETE FROM fraud_rules WHERE id = %s", (rule_id,))
     conn.commit()
     conn.close()
+    invalidate_rules_cache()
+    fetch_rules.clear()
 
 st.markdown("<h1>Fraud Detection Rule Engine</h1>", unsafe_allow_html=True)
 
@@ -1,9 +1,12 @@
 import subprocess
+import sys
 import threading
 import time
 import os
 import logging
 
+import uvicorn
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,60 +19,36 @@ os.makedirs("data", exist_ok=True)
 
 
 def run_api_server():
-    """Run the FastAPI server for real-time data handling."""
-    logger.info("Starting API server...")
-    api_process = subprocess.Popen(
-        ["python", "server.py"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
-
-    # Log output from the API server
-    for line in api_process.stdout:
-        logger.info(f"API: {line.strip()}")
-
-    # Log any errors
-    for line in api_process.stderr:
-        logger.error(f"API Error: {line.strip()}")
+    """Run the FastAPI server for real-time data handling in this process."""
+    from server import app
 
-    return api_process
+    logger.info("Starting API server...")
+    # log_config=None leaves uvicorn's loggers on the root handler configured above
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_config=None)
 
 
 def run_streamlit_dashboard():
     """Run the Streamlit dashboard."""
     logger.info("Starting Streamlit dashboard...")
-    streamlit_process = subprocess.Popen(
-        ["streamlit", "run", "app.py", "--server.port", "5000", "--server.address", "0.0.0.0"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
+    # Streamlit has to own its interpreter; its output goes straight to this terminal, so no pipe can fill up
+    return subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.port", "5000", "--server.address", "0.0.0.0"]
     )
 
-    # Log output from Streamlit
-    for line in streamlit_process.stdout:
-        logger.info(f"Streamlit: {line.strip()}")
-
-    # Log any errors
-    for line in streamlit_process.stderr:
-        logger.error(f"Streamlit Error: {line.strip()}")
-
-    return streamlit_process
-
 
 def main():
     """Run both the API server and Streamlit dashboard."""
     logger.info("Starting Fraud Analysis System")
 
     # Start the API server in a separate thread
-    api_thread = threading.Thread(target=run_api_server)
+    api_thread = threading.Thread(target=run_api_server, name="api-server")
     api_thread.daemon = True
     api_thread.start()
 
     # Wait a moment for the API server to start
     time.sleep(2)
 
-    # Start the Streamlit dashboard in the main thread
+    # Start the Streamlit dashboard
     streamlit_process = run_streamlit_dashboard()
 
     try:
@@ -77,7 +56,8 @@ def main():
         streamlit_process.wait()
     except KeyboardInterrupt:
         logger.info("Shutting down...")
+        streamlit_process.terminate()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,9 +1,17 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
 API_URL = "http://127.0.0.1:8000/detect"
 
+@st.cache_resource
+def api_session():
+    # Keep-alive connections to the API survive reruns instead of a new TCP connection per click
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
 st.title("💳 Fraud Detection System")
 
 transaction_id = st.text_input("Transaction ID")
@@ -35,7 +43,7 @@ if st.button("Check for Fraud"):
         "payer_card_brand": payer_card_brand
     }
 
-    response = requests.post(API_URL, json=transaction_data)
+    response = api_session().post(API_URL, json=transaction_data, timeout=3)
 
     if response.status_code == 200:
         result = response.json()